@@ -0,0 +1,142 @@
+"""
+Adaptive polling interval, decided from the recorded check history.
+
+After each scheduled check AdaptivePolicy.decide() looks at the checks of the
+last day in the history store and picks the wait until the next one:
+
+- after consecutive blocked (403) checks it backs off exponentially;
+- with no count changes in the lookback window it stretches to the maximum;
+- otherwise the interval follows the observed change rate, aiming at roughly
+  one change every other check, clamped to [min, max];
+- the hourly request budget is a floor on the interval, and when the last
+  hour already used the budget the next check waits until it frees up;
+- the result is jittered so checks do not land on a fixed grid.
+"""
+
+import random
+import time
+from datetime import datetime
+
+# Statuses whose rows carry a count that reflects the page
+COUNTED_STATUSES = ('ok', 'unchanged')
+
+
+class ScheduleDecision:
+    """The interval chosen after a check, why, and when the next check runs"""
+
+    def __init__(self, interval, delay, reason, decided_at):
+        self.interval = interval
+        self.delay = delay
+        self.reason = reason
+        self.decided_at = decided_at
+        self.next_run = decided_at + delay
+
+    def to_dict(self):
+        return {
+            "interval_seconds": round(self.interval),
+            "delay_seconds": round(self.delay),
+            "reason": self.reason,
+            "decided_at": datetime.fromtimestamp(self.decided_at).isoformat(),
+            "next_run": datetime.fromtimestamp(self.next_run).isoformat()
+        }
+
+
+class AdaptivePolicy:
+    """Chooses the next polling delay from the history store's recent checks"""
+
+    def __init__(self, history, min_interval=600, base_interval=3600, max_interval=4 * 3600,
+                 blocked_max_interval=12 * 3600, max_requests_per_hour=6, jitter=0.1,
+                 lookback=24 * 3600, changes_per_check=0.5):
+        self.history = history
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.blocked_max_interval = blocked_max_interval
+        self.max_requests_per_hour = max_requests_per_hour
+        self.jitter = jitter
+        self.lookback = lookback
+        self.changes_per_check = changes_per_check
+        self.last_decision = None
+
+    @classmethod
+    def from_config(cls, history, config):
+        """Build from the "schedule" config section (minutes, see CONFIG_README.md)"""
+        config = config or {}
+        return cls(
+            history,
+            min_interval=config.get('min_minutes', 10) * 60,
+            base_interval=config.get('base_minutes', 60) * 60,
+            max_interval=config.get('max_minutes', 240) * 60,
+            blocked_max_interval=config.get('blocked_max_minutes', 720) * 60,
+            max_requests_per_hour=int(config.get('max_requests_per_hour', 6)),
+            jitter=config.get('jitter', 0.1)
+        )
+
+    def recent_checks(self, now):
+        """The checks in the lookback window as (ts, {problem_id: count}, statuses), oldest first"""
+        checks = []
+        for ts, problem_id, count, status in self.history.iter_since(now - self.lookback):
+            if not checks or checks[-1][0] != ts:
+                checks.append((ts, {}, set()))
+            checks[-1][2].add(status)
+            if status in COUNTED_STATUSES and count is not None:
+                checks[-1][1][problem_id] = count
+        return checks
+
+    def decide(self, now=None):
+        """Pick the next delay; the decision is kept as last_decision for the API"""
+        now = time.time() if now is None else now
+        checks = self.recent_checks(now)
+        interval, reason = self._interval(checks, now)
+
+        # Never plan more checks than the hourly budget allows
+        budget_floor = 3600 / self.max_requests_per_hour if self.max_requests_per_hour else 0
+        if interval < budget_floor:
+            interval = budget_floor
+            reason += f"; limited to {self.max_requests_per_hour} requests/hour"
+
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+        # Manual refreshes count too; if they used up the last hour, wait for the oldest to age out
+        if self.max_requests_per_hour:
+            last_hour = [ts for ts, _, _ in checks if ts > now - 3600]
+            if len(last_hour) >= self.max_requests_per_hour:
+                budget_wait = last_hour[-self.max_requests_per_hour] + 3600 - now
+                if budget_wait > delay:
+                    delay = budget_wait
+                    reason += f"; hourly budget used ({len(last_hour)} checks in the last hour)"
+
+        self.last_decision = ScheduleDecision(interval, max(delay, 1), reason, now)
+        return self.last_decision
+
+    def _interval(self, checks, now):
+        if not checks:
+            return self.base_interval, "no recent checks; using the base interval"
+
+        blocked = 0
+        for _, _, statuses in reversed(checks):
+            if statuses != {'blocked'}:
+                break
+            blocked += 1
+        if blocked:
+            interval = min(self.base_interval * 2 ** blocked, self.blocked_max_interval)
+            return interval, f"backing off after {blocked} blocked check(s) in a row"
+
+        changes = 0
+        previous = {}
+        for _, counts, _ in checks:
+            if any(problem_id in previous and previous[problem_id] != count for problem_id, count in counts.items()):
+                changes += 1
+            previous.update(counts)
+
+        hours = round(self.lookback / 3600)
+        if not changes:
+            return self.max_interval, f"no count changes in the last {hours}h"
+
+        observed = max(now - checks[0][0], self.base_interval)
+        interval = self.changes_per_check * observed / changes
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return interval, f"{changes} count change(s) in the last {hours}h"
+
+    def status(self):
+        return self.last_decision.to_dict() if self.last_decision is not None else None
@@ -7,14 +7,32 @@ import sys
 if sys.platform.startswith('win'):
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_SUBMITTED
+from apscheduler.jobstores.base import JobLookupError
 from datetime import datetime
 import threading
+import atexit
+import sqlite3
 
 # Import the SIH monitor class
 from sih_monitor import SIHSubmissionMonitor
+from circuit_breaker import CircuitOpen
+from request_governor import RequestBudgetExceeded
+from config_loader import parse_problem_ids
+from http_session import session_manager
+from refresh_jobs import RefreshJobs
+from catalog import ProblemCatalog, build_catalog
+from movers import MoversTracker, parse_window
+from adaptive_schedule import AdaptivePolicy
+from leader_election import LeaderElection
+from state_store import SharedDocumentStore
+from response_cache import ResponseCache
+from event_stream import EventBroadcaster, TooManySubscribers
+import metrics
+from tracing import tracer, traced
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -26,93 +44,462 @@ last_refresh_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 # State to store the current count
 current_state = {
     "count": None,
+    "counts": {},
     "last_refresh": last_refresh_time,
-    "problem_id": monitor.target_id
+    "problem_id": monitor.target_id,
+    "problem_ids": monitor.target_ids
 }
 
+# Only the leader scrapes, so it publishes the catalog and its schedule decision
+# next to the shared state for the other workers to serve
+catalog_store = SharedDocumentStore(os.environ.get('STATE_DB', 'monitor_state.db'), 'catalog')
+schedule_store = SharedDocumentStore(os.environ.get('STATE_DB', 'monitor_state.db'), 'schedule')
+
+def load_shared_documents():
+    try:
+        catalog = catalog_store.load()
+        return (ProblemCatalog.from_dict(catalog) if catalog else None), (schedule_store.load() or None)
+    except (sqlite3.Error, KeyError, ValueError) as e:
+        monitor.logger.error(f"Error loading the shared catalog and schedule: {e}")
+        return None, None
+
+# Every problem statement from the last parsed page (see catalog.py), and the
+# leader's latest schedule decision
+current_catalog, current_schedule = load_shared_documents()
+
+# Checks may stop reading the page early once the watched rows are in, but the
+# catalog needs the whole table: download it in full when it is this old
+CATALOG_MAX_AGE = (monitor.config.get('fetch') or {}).get('catalog_max_age_minutes', 60) * 60
+
+def catalog_due():
+    return current_catalog is None or time.time() - current_catalog.built_at > CATALOG_MAX_AGE
+
+# Full-catalog snapshots for /api/movers, kept next to the check history
+movers_tracker = MoversTracker(monitor.history)
+
+# Picks the wait before each scheduled check from the recent check history
+schedule_policy = AdaptivePolicy.from_config(monitor.history, monitor.config.get('schedule'))
+
 # Lock for thread safety
 state_lock = threading.Lock()
 
-def update_submission_count():
-    """Update the submission count and save to state"""
-    global current_state, last_refresh_time
+def safe_config():
+    """The current configuration without sensitive data"""
+    return {
+        "target_problem_id": monitor.target_id,
+        "target_problem_ids": monitor.target_ids,
+        "email_enabled": monitor.config.get("email", {}).get("enabled", False),
+        "whatsapp_enabled": monitor.config.get("whatsapp", {}).get("enabled", False),
+        "email_digest": "email" in monitor.digests,
+        "whatsapp_digest": "whatsapp" in monitor.digests
+    }
+
+def count_snapshot():
+    with state_lock:
+        return current_state.copy()
+
+def count_body(snapshot):
+    """A state snapshot plus the scheduler's interval and the circuit breaker, as /api/count and /api/stream send it"""
+    body = dict(snapshot)
+    with state_lock:
+        body["schedule"] = current_schedule
+        body["circuit"] = current_circuit
+    return body
+
+def count_response():
+    """Body of /api/count"""
+    return count_body(count_snapshot())
+
+# The breaker status last put into the cached /api/count body
+current_circuit = monitor.breaker.status()
+
+def sync_circuit_status():
+    """
+    Pick up the shared breaker row, rebuilding the cached /api/count body if it changed.
+    
+    Runs on every change this process makes to the breaker (its on_change hook),
+    before each state is published, and on the election tick for changes made
+    by other processes, so /api/count itself never reads the breaker.
+    """
+    global current_circuit
+    try:
+        status = monitor.breaker.status()
+    except sqlite3.Error as e:
+        monitor.logger.error(f"Error reading circuit breaker: {e}")
+        return
+    with state_lock:
+        changed = status != current_circuit
+        current_circuit = status
+    if changed:
+        response_cache.invalidate('count')
+
+# Pre-serialized bodies for the polled read endpoints; invalidated whenever
+# current_state or the config changes
+response_cache = ResponseCache(app.json.dumps)
+response_cache.register('count', count_response)
+response_cache.register('config', safe_config)
+response_cache.register('problem-config', lambda: dict(monitor.problem_config))
+monitor.breaker.on_change = lambda state: sync_circuit_status()
+
+# Pushes each committed state to /api/stream subscribers
+event_stream = EventBroadcaster(max_subscribers=int(os.environ.get('MAX_STREAM_SUBSCRIBERS', '20')))
+
+def state_committed(snapshot):
+    """Publish a new current_state: drop the cached /api/count body and notify stream subscribers"""
+    # The breaker may have moved in the refresh that produced this state
+    sync_circuit_status()
+    response_cache.invalidate('count')
+    event_stream.publish('state', count_body(snapshot))
+
+def current_counts_metric():
+    with state_lock:
+        counts = dict(current_state.get("counts") or {})
+    return {(problem_id,): count for problem_id, count in counts.items()}
+
+CHECKS = metrics.Counter('sih_checks_total', "Completed refreshes by outcome", ('status',))
+CHECK_SECONDS = metrics.Histogram('sih_check_duration_seconds', "Duration of a whole refresh, fetch to commit")
+LAST_SUCCESS = metrics.Gauge('sih_last_success_timestamp_seconds', "Unix time of the last successful refresh")
+# Read from current_state at scrape time, so the refresh path does no extra work
+SUBMISSION_COUNT = metrics.Gauge('sih_submission_count', "Current submission count per watched problem ID",
+                                 ('problem_id',), callback=current_counts_metric)
+SCHEDULER_LAG = metrics.Histogram('sih_scheduler_lag_seconds', "Delay between a job's planned and actual start",
+                                  buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300))
+
+def record_check(status, fetch_started):
+    CHECKS.inc(status=status)
+    CHECK_SECONDS.observe(time.perf_counter() - fetch_started)
+    if status in ('ok', 'unchanged'):
+        LAST_SUCCESS.set(time.time())
+
+@traced('check', trigger='app')
+def update_submission_count(budget_wait=None):
+    """
+    Update the submission count and save to state.
+    
+    budget_wait is how long to wait for the shared request budget (0 fails fast with
+    RequestBudgetExceeded, leaving the cached state as it is).
+    """
+    global current_state, current_catalog, last_refresh_time
     
+    fetch_started = time.perf_counter()
+    # Diff against the newest shared counts, even if another process wrote them
+    sync_shared_state()
+    watched_ids = list(monitor.target_ids)
     try:
-        # Fetch the page and parse the count
-        html_content = monitor.fetch_page_content()
-        count = monitor.parse_submission_count(html_content)
+        # Fetch the page once and parse every watched ID from it; after an error the
+        # stored counts are not trustworthy, so fetch unconditionally
+        with state_lock:
+            conditional = "error" not in current_state and monitor.has_all_counts(current_state.get("counts") or {})
+        # Stream and hang up after the watched rows, unless this check should also rebuild the catalog
+        stop_after = None if catalog_due() else monitor.early_stop_ids()
+        html_content = monitor.fetch_page_content(conditional=conditional, budget_wait=budget_wait,
+                                                  stop_after=stop_after)
+        fetch_latency_ms = (time.perf_counter() - fetch_started) * 1000
+        
+        # Committing counts for the old IDs would undo a problem ID change made meanwhile
+        sync_shared_state()
+        if monitor.target_ids != watched_ids:
+            monitor.logger.info("Watched problem IDs changed during the refresh; discarding its result")
+            record_check('superseded', fetch_started)
+            return False
+        
+        if html_content is None:
+            # Page unchanged since the last successful check - skip parsing and notifications
+            with state_lock:
+                current_state["last_refresh"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                current_state.pop("error", None)
+                current_state.pop("status", None)
+                unchanged_counts = dict(current_state.get("counts") or {})
+                snapshot = current_state.copy()
+            
+            state_committed(snapshot)
+            # Persisted by the write-behind thread, outside the state lock
+            monitor.state_store.save(snapshot)
+            monitor.record_history(unchanged_counts, fetch_latency_ms, 'unchanged')
+            record_check('unchanged', fetch_started)
+            return True
+        
+        counts = monitor.parse_submission_counts(html_content)
+        
+        # Keep the whole page as a compact columnar table for /api/problems (not from a cut-short page)
+        catalog = None
+        if stop_after is None:
+            try:
+                with tracer.span('catalog', kind='build'):
+                    catalog = build_catalog(html_content)
+            except Exception as e:
+                monitor.logger.error(f"Error building problem catalog: {e}")
+            else:
+                publish_catalog(catalog)
         
         # Update the state with thread safety
         with state_lock:
-            previous_count = current_state.get("count")
-            current_state["count"] = count
+            if catalog is not None:
+                current_catalog = catalog
+            previous_counts = dict(current_state.get("counts") or {})
+            current_state["counts"] = counts
+            current_state["count"] = counts.get(monitor.target_id)
             current_state["problem_id"] = monitor.target_id  # Ensure problem_id is always current
+            current_state["problem_ids"] = monitor.target_ids
             current_state["last_refresh"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            # Clear any previous error
-            if "error" in current_state:
-                del current_state["error"]
+            # Clear any previous error (and a blocked status left by it)
+            current_state.pop("error", None)
+            current_state.pop("status", None)
             
-            # Save state to file for persistence
-            with open('monitor_state.json', 'w') as f:
-                json.dump(current_state, f)
+            # Report IDs that were not on the page
+            missing_ids = [problem_id for problem_id in monitor.target_ids if problem_id not in counts]
+            if missing_ids:
+                current_state["missing_ids"] = missing_ids
+            elif "missing_ids" in current_state:
+                del current_state["missing_ids"]
             
-            # If count changed and we have a previous count, send notifications
-            if previous_count is not None and count != previous_count:
-                try:
-                    monitor.send_email_notification(count, previous_count)
-                except Exception as email_err:
-                    monitor.logger.error(f"Email notification error: {email_err}")
-                
-                try:
-                    monitor.send_whatsapp_notification(count, previous_count)
-                except Exception as whatsapp_err:
-                    monitor.logger.error(f"WhatsApp notification error: {whatsapp_err}")
-                
+            snapshot = current_state.copy()
+        state_committed(snapshot)
+        
+        # The page parsed cleanly, so its validators can be used for the next check
+        monitor.save_validators()
+        
+        # If a count changed and we have a previous count, notify (directly or via
+        # the channel's digest); the dispatcher delivers in the background
+        for problem_id, count in counts.items():
+            previous_count = previous_counts.get(problem_id)
+            if previous_count is None or count == previous_count:
+                continue
+            monitor.notify_change(problem_id, count, previous_count)
+        
+        # Diff every problem on the page against the previous snapshot
+        if catalog is not None:
+            try:
+                with tracer.span('catalog', kind='snapshot'):
+                    movers_tracker.record(catalog)
+            except Exception as e:
+                monitor.logger.error(f"Error recording catalog snapshot: {e}")
+        
+        # Persisted by the write-behind thread, outside the state lock
+        monitor.state_store.save(snapshot)
+        monitor.record_history(counts, fetch_latency_ms, 'ok')
+        record_check('ok', fetch_started)
         return True
+    except RequestBudgetExceeded as e:
+        # Not an upstream problem: keep the cached state and let the caller report it
+        monitor.logger.warning(f"Skipping refresh: {e}")
+        record_check('rate_limited', fetch_started)
+        raise
+    except CircuitOpen as e:
+        # Still cooling down after a block: answer from the last good counts without going upstream
+        monitor.logger.warning(f"Skipping refresh: {e}")
+        with state_lock:
+            current_state["problem_id"] = monitor.target_id
+            current_state["problem_ids"] = monitor.target_ids
+            current_state["error"] = str(e)
+            current_state["status"] = "blocked"
+            snapshot = current_state.copy()
+        state_committed(snapshot)
+        monitor.state_store.save(snapshot)
+        record_check('circuit_open', fetch_started)
+        return False
     except Exception as e:
         error_msg = str(e)
         monitor.logger.error(f"Error updating count: {error_msg}")
         
         # Handle different types of errors
+        status = "error"
         with state_lock:
             current_state["problem_id"] = monitor.target_id  # Ensure problem_id is always current
+            current_state["problem_ids"] = monitor.target_ids
             current_state["last_refresh"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             current_state["error"] = error_msg
             
             # Only set count to 0 if it's not a 403 error (keep previous count for 403)
             if "403" not in error_msg and "Forbidden" not in error_msg:
                 current_state["count"] = 0
+                current_state["counts"] = {problem_id: 0 for problem_id in monitor.target_ids}
             # For 403 errors, keep the previous count and add a warning
             elif "403" in error_msg or "Forbidden" in error_msg:
                 current_state["error"] = "Website is blocking requests (403 Forbidden). This is likely due to anti-bot measures."
                 current_state["status"] = "blocked"
+                status = "blocked"
             
-            # Save state to file for persistence
-            with open('monitor_state.json', 'w') as f:
-                json.dump(current_state, f)
+            snapshot = current_state.copy()
+        state_committed(snapshot)
+        
+        # Persisted by the write-behind thread, outside the state lock
+        monitor.state_store.save(snapshot)
+        monitor.record_history({}, (time.perf_counter() - fetch_started) * 1000, status)
+        record_check(status, fetch_started)
         return False
 
+def publish_catalog(catalog):
+    """Share a new catalog with the workers that serve /api/problems without scraping"""
+    try:
+        with tracer.span('catalog', kind='publish'):
+            catalog_store.save(catalog.to_dict())
+    except sqlite3.Error as e:
+        monitor.logger.error(f"Error publishing problem catalog: {e}")
+
+def sync_shared_documents():
+    """Adopt a catalog or schedule decision the leader published since the last look"""
+    global current_catalog, current_schedule
+    try:
+        catalog = catalog_store.read_if_changed()
+        schedule = schedule_store.read_if_changed()
+    except sqlite3.Error as e:
+        monitor.logger.error(f"Error reading the shared catalog and schedule: {e}")
+        return
+    if catalog:
+        catalog = ProblemCatalog.from_dict(catalog)
+        with state_lock:
+            current_catalog = catalog
+    if schedule:
+        with state_lock:
+            current_schedule = schedule
+        state_committed(count_snapshot())
+
 # Try to load previous state if it exists
 try:
-    if os.path.exists('monitor_state.json'):
-        with open('monitor_state.json', 'r') as f:
-            loaded_state = json.load(f)
-            # Update current_state with loaded data
-            current_state.update(loaded_state)
-            # Ensure problem_id is set correctly from monitor
-            current_state["problem_id"] = monitor.target_id
+    loaded_state = monitor.state_store.load()
+    # Update current_state with loaded data (already in the shared schema)
+    current_state.update({key: value for key, value in loaded_state.items() if value is not None})
 except Exception as e:
     monitor.logger.error(f"Error loading previous state: {e}")
 
 # Ensure problem_id is always set correctly
 current_state["problem_id"] = monitor.target_id
+current_state["problem_ids"] = monitor.target_ids
+
+# Longest a client may hold a request open waiting for a refresh job
+MAX_REFRESH_WAIT = 30
+
+# Longest a follower worker waits for the leader to finish a delegated refresh
+DELEGATED_REFRESH_TIMEOUT = 300
+
+# Someone is waiting on these: answer from the cached state rather than queue for the request budget
+FAIL_FAST_TRIGGERS = ('manual', 'delegated')
+
+def run_refresh(trigger):
+    """Scrape here if this worker is the leader, otherwise have the leader do it and pick up its state"""
+    if leadership.is_leader:
+        return update_submission_count(budget_wait=0 if trigger in FAIL_FAST_TRIGGERS else None)
+    
+    request_id = leadership.request_refresh()
+    success = leadership.wait_for_request(request_id, DELEGATED_REFRESH_TIMEOUT)
+    sync_shared_state()
+    return bool(success)
+
+# Every scrape, scheduled or manual, goes through one single-flight job runner;
+# jobs are also recorded in the leader database (store set once it exists)
+refresh_jobs = RefreshJobs(run_refresh)
+
+def sync_shared_state():
+    """Adopt a state another process committed to the shared store (the leader, sih_monitor.py, CI)"""
+    try:
+        loaded = monitor.state_store.read_if_changed()
+    except sqlite3.Error as e:
+        monitor.logger.error(f"Error reading shared state: {e}")
+        return
+    if loaded is None:
+        return
+    
+    # A problem ID change made through any worker's /api/problem-config is followed here
+    ids_changed = monitor.sync_problem_ids(loaded)
+    with state_lock:
+        current_state.update(loaded)
+        for key in ("error", "status", "missing_ids"):
+            if key not in loaded:
+                current_state.pop(key, None)
+        snapshot = current_state.copy()
+    if ids_changed:
+        # The IDs feed every cached body
+        response_cache.invalidate()
+    state_committed(snapshot)
+
+def scheduled_refresh():
+    """Scheduler entry point; attaches to a manual refresh if one is already running"""
+    try:
+        job, _ = refresh_jobs.submit('scheduler')
+        job.wait()
+    finally:
+        if leadership.is_leader:
+            plan_next_refresh()
+
+def plan_next_refresh():
+    """Schedule the next check after the delay the adaptive policy picks from recent history"""
+    try:
+        decision = schedule_policy.decide()
+    except Exception as e:
+        monitor.logger.error(f"Adaptive schedule failed, falling back to the base interval: {e}")
+        delay, reason = schedule_policy.base_interval, f"fallback after error: {e}"
+    else:
+        delay, reason = decision.delay, decision.reason
+    monitor.logger.info(f"Next check in {delay / 60:.1f} minutes ({reason})")
+    scheduler.add_job(scheduled_refresh, 'date', run_date=datetime.fromtimestamp(time.time() + delay),
+                      id='refresh', replace_existing=True, misfire_grace_time=None)
+    publish_schedule(schedule_policy.status())
+
+def publish_schedule(status):
+    """Serve the new decision here and share it with the other workers"""
+    global current_schedule
+    with state_lock:
+        current_schedule = status
+    # Stream subscribers show the next check too
+    state_committed(count_snapshot())
+    if status is None:
+        return
+    try:
+        schedule_store.save(status)
+    except sqlite3.Error as e:
+        monitor.logger.error(f"Error publishing schedule decision: {e}")
+
+def observe_scheduler_lag(event):
+    """Time between when a job was due and when APScheduler submitted it"""
+    if event.scheduled_run_times:
+        planned = max(event.scheduled_run_times)
+        SCHEDULER_LAG.observe(max((datetime.now(planned.tzinfo) - planned).total_seconds(), 0))
+
+def on_elected():
+    """This worker took the scraping lease: start planning checks"""
+    plan_next_refresh()
+
+def on_demoted():
+    """Another worker holds the lease now: stop scheduling checks here"""
+    try:
+        scheduler.remove_job('refresh')
+    except JobLookupError:
+        pass
 
-# Initialize scheduler for hourly updates
+def on_refresh_requested(request_ids):
+    """Run refreshes that follower workers asked for and report back once the state is committed"""
+    job, _ = refresh_jobs.submit('delegated')
+    
+    def finish():
+        job.wait()
+        leadership.finish_requests(request_ids, job.success)
+    threading.Thread(target=finish, name='delegated-refresh', daemon=True).start()
+
+def on_election_tick(leader):
+    # The leader syncs too, so writes from a separately running sih_monitor.py reach /api/stream
+    sync_shared_state()
+    sync_shared_documents()
+    sync_circuit_status()
+
+# Initialize the scheduler; checks are only planned while this worker leads
 scheduler = BackgroundScheduler()
-scheduler.add_job(update_submission_count, 'interval', hours=1)
+scheduler.add_listener(observe_scheduler_lag, EVENT_JOB_SUBMITTED)
 scheduler.start()
 
+# One worker (per host) scrapes; the others serve the state it persists
+leadership = LeaderElection(
+    os.environ.get('LEADER_DB', 'monitor_leader.db'),
+    on_elected=on_elected,
+    on_demoted=on_demoted,
+    on_tick=on_election_tick,
+    on_refresh_requested=on_refresh_requested
+)
+refresh_jobs.store = leadership
+leadership.start()
+atexit.register(leadership.release)
+
 # API Routes
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -120,39 +507,263 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "problem_id": monitor.target_id
+        "problem_id": monitor.target_id,
+        "problem_ids": monitor.target_ids,
+        "scraping_leader": leadership.is_leader
     })
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of every metric in this process"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/count', methods=['GET'])
 def get_count():
-    """Get the current submission count"""
-    return jsonify(current_state)
+    """Get the current submission count for every watched problem ID (ETag / 304 aware)"""
+    # One PRAGMA when nothing changed; picks up another process's commit without waiting for the tick
+    sync_shared_state()
+    return response_cache.respond('count', request)
+
+@app.route('/api/schedule', methods=['GET'])
+def get_schedule():
+    """The adaptive scheduler's current interval, the reason for it and the next planned check"""
+    sync_shared_documents()
+    with state_lock:
+        decision = current_schedule
+    return jsonify({
+        "decision": decision,
+        "limits": {
+            "min_interval_seconds": schedule_policy.min_interval,
+            "base_interval_seconds": schedule_policy.base_interval,
+            "max_interval_seconds": schedule_policy.max_interval,
+            "blocked_max_interval_seconds": schedule_policy.blocked_max_interval,
+            "max_requests_per_hour": schedule_policy.max_requests_per_hour,
+            "jitter": schedule_policy.jitter
+        }
+    })
+
+@app.route('/api/stream', methods=['GET'])
+def stream_state():
+    """
+    Server-Sent Events: a 'snapshot' event with the current state, then a
+    'state' event each time a refresh commits a new one.
+    
+    Reconnecting clients send Last-Event-ID (or ?last_event_id) and are
+    replayed the events they missed. Idle connections get a heartbeat comment.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        subscriber, missed = event_stream.subscribe(last_event_id)
+    except TooManySubscribers as e:
+        return jsonify({
+            "success": False,
+            "message": f"Too many stream subscribers ({e}); poll /api/count instead"
+        }), 503
+    
+    response = Response(event_stream.stream(subscriber, missed, count_response), mimetype='text/event-stream')
+    # Also covers a response that is closed before the stream was ever started
+    response.call_on_close(lambda: event_stream.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh_count():
-    """Manually refresh the submission count"""
-    success = update_submission_count()
+    """
+    Start a refresh job, or attach to the one already running.
+    
+    Returns the job immediately (202); pass ?wait=<seconds> to wait for the result.
+    """
+    job, started = refresh_jobs.submit('manual')
+    return refresh_job_response(job, "Refresh started" if started else "Attached to running refresh")
+
+@app.route('/api/refresh/<job_id>', methods=['GET'])
+def get_refresh_job(job_id):
+    """Poll a refresh job; pass ?wait=<seconds> to wait for it to finish"""
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": f"Unknown refresh job {job_id}"
+        }), 404
+    return refresh_job_response(job)
+
+def refresh_job_response(job, message=None):
+    """Build the response for a refresh job, waiting up to ?wait seconds for it to finish"""
+    try:
+        wait = min(float(request.args.get('wait', 0)), MAX_REFRESH_WAIT)
+    except ValueError:
+        wait = 0
+    if wait > 0:
+        job.wait(wait)
+    
+    if not job.done:
+        return jsonify({
+            "success": True,
+            "job": job.to_dict(),
+            "data": None,
+            "message": message or "Refresh in progress"
+        }), 202
+    
+    # A failed refresh still returns the last known counts (e.g. when the request budget is used up);
+    # the job may have run on another worker, so pick up the state it committed first
+    sync_shared_state()
+    sync_circuit_status()
+    # Same shape as /api/count, so the dashboard can show it as-is
+    data = count_response()
     return jsonify({
-        "success": success,
-        "data": current_state if success else None,
-        "message": "Count refreshed successfully" if success else "Failed to refresh count"
+        "success": job.success,
+        "job": job.to_dict(),
+        "data": data,
+        "message": "Count refreshed successfully" if job.success else (job.error or "Failed to refresh count")
     })
 
+def parse_time_param(value):
+    """Accept epoch seconds or an ISO-8601 timestamp from a query parameter"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    """
+    Get the recorded counts for a problem ID between ?from and ?to.
+    
+    Downsampled in the database to at most ?points buckets (default 200, max 1000);
+    ?raw=1 streams every observation as newline-delimited JSON instead.
+    """
+    problem_id = request.args.get('problem_id', monitor.target_id)
+    try:
+        start = parse_time_param(request.args.get('from'))
+        end = parse_time_param(request.args.get('to'))
+        points = min(max(int(request.args.get('points', 200)), 1), 1000)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": f"Invalid history query: {e}"
+        }), 400
+    
+    if request.args.get('raw') in ('1', 'true'):
+        def generate():
+            for ts, count, latency_ms, status in monitor.history.iter_range(problem_id, start, end):
+                yield json.dumps({
+                    "timestamp": datetime.fromtimestamp(ts).isoformat(),
+                    "count": count,
+                    "latency_ms": latency_ms,
+                    "status": status
+                }) + "\n"
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    buckets = []
+    for bucket in monitor.history.downsample(problem_id, start, end, points):
+        bucket["from"] = datetime.fromtimestamp(bucket["from"]).isoformat()
+        bucket["to"] = datetime.fromtimestamp(bucket["to"]).isoformat()
+        buckets.append(bucket)
+    
+    return jsonify({
+        "problem_id": problem_id,
+        "from": request.args.get('from'),
+        "to": request.args.get('to'),
+        "points": buckets
+    })
+
+@app.route('/api/problems', methods=['GET'])
+def get_problems():
+    """
+    List every problem statement from the last fetched page.
+    
+    Filters: ?organization, ?department, ?category, ?theme (case-insensitive exact),
+    ?q (title substring), ?min_count, ?max_count. Sorting: ?sort (serial, problem_id,
+    count, title, organization, category, theme) and ?order (asc/desc).
+    Pagination: ?offset and ?limit (default 50, max 500).
+    """
+    sync_shared_documents()
+    with state_lock:
+        catalog = current_catalog
+    if catalog is None:
+        return jsonify({
+            "success": False,
+            "message": "Problem catalog not loaded yet; try again after the first refresh"
+        }), 503
+    
+    try:
+        min_count = request.args.get('min_count')
+        max_count = request.args.get('max_count')
+        order = request.args.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be asc or desc")
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        total, problems = catalog.query(
+            organization=request.args.get('organization'),
+            department=request.args.get('department'),
+            category=request.args.get('category'),
+            theme=request.args.get('theme'),
+            q=request.args.get('q'),
+            min_count=int(min_count) if min_count else None,
+            max_count=int(max_count) if max_count else None,
+            sort=request.args.get('sort', 'serial'),
+            order=order,
+            offset=offset,
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": f"Invalid problems query: {e}"
+        }), 400
+    
+    return jsonify({
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "built_at": datetime.fromtimestamp(catalog.built_at).isoformat(),
+        "problems": problems
+    })
+
+@app.route('/api/movers', methods=['GET'])
+def get_movers():
+    """
+    Problems whose submission count grew most over ?window (1h, 24h, ...; default 24h).
+    
+    Returns the top ?limit (default 10, max 100) by absolute and by relative growth,
+    compared against the snapshot that was current at the start of the window.
+    """
+    window = request.args.get('window', '24h')
+    try:
+        window_seconds = parse_window(window)
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": f"Invalid movers query: {e}"
+        }), 400
+    
+    result = movers_tracker.movers(window_seconds, limit)
+    if result is None:
+        return jsonify({
+            "success": False,
+            "message": "No catalog snapshots yet; try again after the first refresh"
+        }), 503
+    
+    result["window"] = window
+    result["baseline_at"] = datetime.fromtimestamp(result["baseline_at"]).isoformat()
+    result["current_at"] = datetime.fromtimestamp(result["current_at"]).isoformat()
+    return jsonify(result)
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get the current configuration (excluding sensitive data)"""
-    # Create a copy of the config without sensitive information
-    safe_config = {
-        "target_problem_id": monitor.target_id,
-        "email_enabled": monitor.config.get("email", {}).get("enabled", False),
-        "whatsapp_enabled": monitor.config.get("whatsapp", {}).get("enabled", False)
-    }
-    return jsonify(safe_config)
+    return response_cache.respond('config', request)
 
 @app.route('/api/problem-config', methods=['GET'])
 def get_problem_config():
     """Get the current problem statement configuration"""
-    return jsonify(monitor.problem_config)
+    return response_cache.respond('problem-config', request)
 
 @app.route('/api/problem-config', methods=['POST'])
 def update_problem_config():
@@ -166,8 +777,16 @@ def update_problem_config():
                 "message": "problem_statement_id is required"
             }), 400
         
+        # Accept a single ID, a comma-separated string or a list of IDs
+        problem_ids = parse_problem_ids(data['problem_statement_id'])
+        if not problem_ids:
+            return jsonify({
+                "success": False,
+                "message": "problem_statement_id must contain at least one ID"
+            }), 400
+        
         # Update the problem config
-        monitor.problem_config['problem_statement_id'] = data['problem_statement_id']
+        monitor.problem_config['problem_statement_id'] = problem_ids if len(problem_ids) > 1 else problem_ids[0]
         monitor.problem_config['last_updated'] = datetime.now().strftime("%Y-%m-%d")
         
         if 'description' in data:
@@ -179,16 +798,26 @@ def update_problem_config():
         with open('problem_config.json', 'w') as f:
             json.dump(monitor.problem_config, f, indent=2)
         
-        # Update the monitor's target_id
-        monitor.target_id = data['problem_statement_id']
+        # Update the monitor's target IDs
+        monitor.target_ids = problem_ids
+        monitor.target_id = problem_ids[0]
         
         # Reset the state since we're monitoring a new problem
         with state_lock:
             current_state["count"] = None
+            current_state["counts"] = {}
             current_state["problem_id"] = monitor.target_id
+            current_state["problem_ids"] = monitor.target_ids
             current_state["last_refresh"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            if "error" in current_state:
-                del current_state["error"]
+            current_state.pop("error", None)
+            current_state.pop("status", None)
+            current_state.pop("missing_ids", None)
+            snapshot = current_state.copy()
+        # The IDs feed every cached body
+        response_cache.invalidate()
+        state_committed(snapshot)
+        # Committed to the shared store, so every worker (and the leader's next scrape) follows the new IDs
+        monitor.state_store.save(snapshot)
         
         return jsonify({
             "success": True,
@@ -211,6 +840,7 @@ def debug_info():
             "timestamp": datetime.now().isoformat(),
             "target_url": monitor.url,
             "target_id": monitor.target_id,
+            "target_ids": monitor.target_ids,
             "current_state": current_state.copy(),
             "environment": {
                 "python_version": sys.version,
@@ -219,20 +849,40 @@ def debug_info():
             }
         }
         
-        # Test basic connectivity
-        try:
-            session = monitor.get_session_with_headers()
-            response = session.head(monitor.url, timeout=10)
-            debug_info["connectivity_test"] = {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "success": True
-            }
-        except Exception as e:
+        # Test basic connectivity, unless the circuit breaker is keeping requests off the site
+        debug_info["circuit_breaker"] = monitor.breaker.status()
+        debug_info["request_governor"] = monitor.governor.status()
+        if debug_info["circuit_breaker"]["state"] != 'closed':
             debug_info["connectivity_test"] = {
-                "error": str(e),
+                "skipped": "circuit breaker is not closed",
                 "success": False
             }
+        else:
+            try:
+                # Counts against the shared request budget like any other request; never waits for it
+                monitor.governor.acquire(0)
+                session = monitor.get_session_with_headers()
+                response = session.head(monitor.url, timeout=10)
+                debug_info["connectivity_test"] = {
+                    "status_code": response.status_code,
+                    "headers": dict(response.headers),
+                    "success": True
+                }
+            except Exception as e:
+                debug_info["connectivity_test"] = {
+                    "error": str(e),
+                    "success": False
+                }
+        
+        # Connection reuse of the shared session, including the probe above
+        debug_info["http_session"] = session_manager.stats()
+        debug_info["notifications"] = monitor.notifier.stats()
+        debug_info["catalog"] = current_catalog.summary() if current_catalog is not None else None
+        debug_info["page_archive"] = monitor.archive.stats() if monitor.archive is not None else None
+        debug_info["response_cache"] = response_cache.stats()
+        debug_info["event_stream"] = event_stream.stats()
+        debug_info["leadership"] = leadership.stats()
+        debug_info["shared_state"] = monitor.state_store.stats()
         
         return jsonify(debug_info)
         
@@ -253,7 +903,7 @@ def serve_frontend(path):
 
 if __name__ == '__main__':
     # Initial update on startup
-    update_submission_count()
+    refresh_jobs.submit('startup')
     # Render provides PORT environment variable
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
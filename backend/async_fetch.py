@@ -0,0 +1,64 @@
+"""
+Background asyncio loop that runs upstream fetches.
+
+Jitter and retry backoff in the fetch path are awaited on this loop instead of
+blocking with time.sleep, so a pending fetch can be cancelled at any point and
+the thread that asked for it can stop waiting after a timeout. Submitted
+coroutines see the caller's context variables (e.g. the current trace span).
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+
+
+class FetchLoop:
+    """Runs coroutines on a dedicated daemon thread with its own event loop"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='fetch-loop', daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine and return a concurrent.futures.Future; cancelling it cancels the coroutine"""
+        return asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), self._ensure_running())
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine to completion from synchronous code.
+
+        If ``timeout`` seconds pass first, the coroutine is cancelled and
+        TimeoutError is raised.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                # The coroutine itself raised TimeoutError
+                raise
+            future.cancel()
+            raise TimeoutError(f"Fetch did not finish within {timeout} seconds")
+
+
+async def _in_context(context, coro):
+    # The loop thread's task starts from its own context; adopt the submitter's values
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+# Shared by every caller in this process
+fetch_loop = FetchLoop()
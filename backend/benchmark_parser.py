@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the page parsers, with regression thresholds.
+
+Runs every parser engine against debug_page.html and synthetic pages of 10k
+and 100k rows (built from the fixture's own row markup), for a watched ID
+that is on the page and one that is not (the BeautifulSoup regex fallback
+path). Each case runs in a fresh interpreter so earlier cases' imports and
+caches do not skew it. Memory is the tracemalloc peak of one parse: process
+peak RSS never drops, and loading the page alone already sets it, so an RSS
+delta reads 0 for every engine that does not copy the whole page.
+
+    python benchmark_parser.py                          # fixture + 10k rows vs the baseline
+    python benchmark_parser.py --sizes fixture,10000,100000   # full sweep (slow: ~1 min per pass at 100k)
+    python benchmark_parser.py --engines scanner,monitor --update-baseline
+
+Exits with status 1 if a case returns the wrong count or is slower / uses
+more memory than its baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE = os.path.join(HERE, 'debug_page.html')
+BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+
+MISSING_ID = '999999'
+FIRST_SYNTHETIC_ID = 300000
+
+# Engines that build a whole BeautifulSoup tree are only run up to this many rows
+BS4_MAX_ROWS = 10000
+
+# Absolute slack so noise on tiny measurements does not count as a regression
+MIN_SLACK = {"wall_s": 0.005, "alloc_peak_mb": 0.5}
+
+
+def legacy_parse(html_content, target_id):
+    """The original BeautifulSoup row loop, kept as a reference engine"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for row in soup.find_all('tr'):
+        cells = row.find_all('td')
+        if len(cells) >= 15:
+            try:
+                if f"SIH{target_id}" in cells[14].get_text().strip() or target_id in cells[3].get_text().strip():
+                    return int(cells[15].get_text().strip())
+            except (ValueError, IndexError):
+                continue
+    return None
+
+
+def monitor_parse(html_content, target_id):
+    """SIHSubmissionMonitor.parse_submission_counts, including its fallback"""
+    from sih_monitor import SIHSubmissionMonitor
+    # Skip __init__: no config, stores or dispatcher are needed to parse
+    monitor = SIHSubmissionMonitor.__new__(SIHSubmissionMonitor)
+    monitor.logger = logging.getLogger('benchmark')
+    monitor.logger.disabled = True
+    try:
+        return monitor.parse_submission_counts(html_content, [target_id]).get(target_id)
+    except ValueError:
+        return None
+
+
+def scanner_parse(html_content, target_id):
+    from submission_parser import scan_submission_counts
+    return scan_submission_counts(html_content, [target_id]).counts.get(target_id)
+
+
+def fragment_parse(html_content, target_id):
+    """The row-fragment fast path, falling back to the streaming scan"""
+    from submission_parser import find_submission_counts
+    return find_submission_counts(html_content, [target_id]).counts.get(target_id)
+
+
+def catalog_parse(html_content, target_id):
+    from catalog import build_catalog
+    return build_catalog(html_content).count_for(target_id)
+
+
+ENGINES = {
+    'monitor': monitor_parse,
+    'scanner': scanner_parse,
+    'fragment': fragment_parse,
+    'catalog': catalog_parse,
+    'legacy': legacy_parse
+}
+
+# Engines that parse the full page with BeautifulSoup on the given case
+BS4_CASES = {('legacy', 'found'), ('legacy', 'missing'), ('monitor', 'missing')}
+
+
+def row_bounds(html_content):
+    """(start, end) offsets of every outer problem row, found from its SIH code cell"""
+    bounds = []
+    for match in re.finditer(r'<td>SIH\d+</td>', html_content):
+        end = html_content.index('</tr>', match.end()) + len('</tr>')
+        start = html_content.rindex('<td class="colomn_border">', 0, match.start())
+        start = html_content.rindex('<tr', 0, start)
+        bounds.append((start, end))
+    return bounds
+
+
+def make_synthetic_page(rows, fixture=FIXTURE):
+    """
+    Build a page with ``rows`` problem rows from the fixture's first row.
+
+    Comments, the modal header and the long description are dropped so a row
+    is about 2 KB; the cell structure (including the nested modal table) is
+    unchanged. Returns (html, {problem_id: count}).
+    """
+    with open(fixture, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    bounds = row_bounds(html_content)
+    head, tail = html_content[:bounds[0][0]], html_content[bounds[-1][1]:]
+    first_row = html_content[bounds[0][0]:bounds[0][1]]
+
+    sih_code = re.search(r'<td>SIH(\d+)</td>', first_row).group(1)
+    template = re.sub(r'<!--.*?-->', '', first_row, flags=re.S)
+    template = re.sub(r'(Description</th>\s*<td>\s*<div[^>]*>).*?(</div>)', r'\1Synthetic problem statement\2',
+                      template, flags=re.S)
+    template = re.sub(r'<div class="modal-header">.*?(?=<div class="modal-body">)', '', template, flags=re.S)
+    template = re.sub(r'\s+', ' ', template)
+    template = re.sub(r'(<td class="colomn_border">)\s*\d+\s*(</td>)', r'\1@SERIAL@\2', template)
+    template = re.sub(r'(<td>SIH)' + sih_code + r'(</td> <td>)\d+(</td>)', r'\g<1>@ID@\g<2>@COUNT@\3', template)
+    template = template.replace(sih_code, '@ID@')
+
+    counts = {}
+    parts = [head]
+    for index in range(rows):
+        problem_id = str(FIRST_SYNTHETIC_ID + index)
+        count = index % 97
+        counts[problem_id] = count
+        parts.append(template.replace('@SERIAL@', str(index + 1)).replace('@ID@', problem_id)
+                     .replace('@COUNT@', str(count)))
+        parts.append('\n')
+    parts.append(tail)
+    return ''.join(parts), counts
+
+
+def run_child(engine, page_path, target_id, repeat):
+    """Measure one case in this process and print the result as JSON"""
+    sys.path.insert(0, HERE)
+    with open(page_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    parse = ENGINES[engine]
+
+    # Import the engine's modules before measuring
+    parse('<table></table>', target_id)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = parse(html_content, target_id)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse(html_content, target_id)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(json.dumps({
+        "result": result,
+        "wall_s": round(min(timings), 4),
+        "alloc_peak_mb": round(alloc_peak / (1024 * 1024), 2)
+    }))
+
+
+def measure(engine, page_path, target_id, repeat):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', engine, page_path, target_id, str(repeat)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def prepare_pages(sizes, workdir):
+    """Yield (size label, page path, rows, found ID, expected count) for each requested size"""
+    for size in sizes:
+        if size == 'fixture':
+            sys.path.insert(0, HERE)
+            from catalog import build_catalog
+            with open(FIXTURE, 'r', encoding='utf-8') as f:
+                catalog = build_catalog(f.read())
+            last = len(catalog) - 1
+            yield size, FIXTURE, len(catalog), str(catalog.problem_ids[last]), catalog.counts[last]
+            continue
+
+        rows = int(size)
+        html_content, counts = make_synthetic_page(rows)
+        page_path = os.path.join(workdir, f'synthetic_{rows}.html')
+        with open(page_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        del html_content
+        # The last row is the worst case for parsers that stop early
+        found_id = str(FIRST_SYNTHETIC_ID + rows - 1)
+        yield str(rows), page_path, rows, found_id, counts[found_id]
+
+
+def check_regression(key, measured, baseline, tolerance):
+    problems = []
+    for metric, slack in MIN_SLACK.items():
+        if metric not in baseline:
+            continue
+        limit = max(baseline[metric] * (1 + tolerance), baseline[metric] + slack)
+        if measured[metric] > limit:
+            problems.append(f"{key}: {metric} {measured[metric]} > {limit:.4g} (baseline {baseline[metric]})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SIH page parsers")
+    parser.add_argument('--sizes', default='fixture,10000', help="comma-separated: fixture and/or row counts")
+    parser.add_argument('--engines', default=','.join(ENGINES), help="comma-separated engines to run")
+    parser.add_argument('--repeat', type=int, help="timed runs per case, best is kept (default 3, 1 above 10k rows)")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed slowdown / growth over the baseline")
+    parser.add_argument('--bs4-max-rows', type=int, default=BS4_MAX_ROWS)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        engine, page_path, target_id, repeat = args.child
+        run_child(engine, page_path, target_id, int(repeat))
+        return 0
+
+    print("🚀 Parser Benchmark")
+    print("=" * 72)
+
+    try:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    results = {}
+    failures = []
+
+    print(f"{'case':<32}{'wall s':>10}{'alloc MB':>11}  status")
+    with tempfile.TemporaryDirectory(prefix='sih-bench-') as workdir:
+        for size, page_path, rows, found_id, expected in prepare_pages(sizes, workdir):
+            for engine in engines:
+                for case, target_id in (('found', found_id), ('missing', MISSING_ID)):
+                    key = f"{engine}/{size}/{case}"
+                    if (engine, case) in BS4_CASES and rows > args.bs4_max_rows:
+                        print(f"{key:<32}{'':>21}  ⏭️  skipped (> {args.bs4_max_rows} rows)")
+                        continue
+
+                    repeat = args.repeat or (3 if rows <= 10000 else 1)
+                    measured = measure(engine, page_path, target_id, repeat)
+                    results[key] = {metric: measured[metric] for metric in MIN_SLACK}
+
+                    wanted = expected if case == 'found' else None
+                    problems = []
+                    if measured["result"] != wanted:
+                        problems.append(f"{key}: returned {measured['result']}, expected {wanted}")
+                    if key in baseline and not args.update_baseline:
+                        problems.extend(check_regression(key, measured, baseline[key], args.tolerance))
+                    failures.extend(problems)
+
+                    status = '❌' if problems else ('✅' if key in baseline or args.update_baseline else '🆕 no baseline')
+                    print(f"{key:<32}{measured['wall_s']:>10}{measured['alloc_peak_mb']:>11}  {status}")
+
+    print()
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Baseline written to {args.baseline}")
+
+    if failures:
+        print("❌ Regressions:")
+        for problem in failures:
+            print(f"   {problem}")
+        return 1
+
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
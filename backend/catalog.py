@@ -0,0 +1,246 @@
+"""
+Columnar in-memory catalog of every problem statement on the SIH page.
+
+The page lists every problem with its organization, title, category, theme,
+SIH code and submission count. ProblemCatalog keeps those as columns instead
+of one dict (or parsed tag) per row: numbers live in typed arrays and the
+heavily repeated strings (organization, department, category, theme) are
+dictionary-encoded, so a catalog of thousands of rows stays a few hundred KB.
+"""
+
+import re
+import time
+from array import array
+
+from submission_parser import CHUNK_SIZE, COUNT_CELL, PROBLEM_ID_CELL, SIH_CODE_CELL, RowScanner
+
+# Cell positions, counted the same way as in submission_parser
+SERIAL_CELL = 0
+ORGANIZATION_CELL = 1
+TITLE_CELL = 4
+DEPARTMENT_CELL = 7
+CATEGORY_CELL = 13
+THEME_CELL = 16
+
+SIH_CODE_PATTERN = re.compile(r'SIH(\d+)')
+DIGITS_PATTERN = re.compile(r'(\d+)')
+
+SORT_KEYS = ('serial', 'problem_id', 'count', 'title', 'organization', 'category', 'theme')
+
+
+class ProblemCatalog:
+    """Column store of problem statements with filtered, sorted and paginated queries"""
+
+    STRING_COLUMNS = ('organization', 'department', 'category', 'theme')
+
+    def __init__(self):
+        self.serials = array('i')
+        self.problem_ids = array('i')
+        self.counts = array('i')
+        self.titles = []
+        self.built_at = time.time()
+        self._values = {column: [] for column in self.STRING_COLUMNS}
+        self._codes = {column: array('H') for column in self.STRING_COLUMNS}
+        self._lookup = {column: {} for column in self.STRING_COLUMNS}
+        self._index = {}
+        self.rows_scanned = 0
+        self.rows_skipped = 0
+
+    def __len__(self):
+        return len(self.problem_ids)
+
+    def append(self, serial, problem_id, title, count, **strings):
+        """Add one row; ``strings`` holds the dictionary-encoded columns"""
+        row = len(self.problem_ids)
+        self.serials.append(serial)
+        self.problem_ids.append(problem_id)
+        self.counts.append(count)
+        self.titles.append(title)
+        for column in self.STRING_COLUMNS:
+            self._codes[column].append(self._encode(column, strings.get(column) or ''))
+        # First occurrence wins, matching how the submission scanner picks a row
+        self._index.setdefault(problem_id, row)
+
+    def _encode(self, column, value):
+        lookup = self._lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self._values[column])
+            self._values[column].append(value)
+        return code
+
+    def value(self, column, row):
+        return self._values[column][self._codes[column][row]]
+
+    def values(self, column):
+        """Distinct values of a dictionary-encoded column"""
+        return [value for value in self._values[column] if value]
+
+    def index_of(self, problem_id):
+        return self._index.get(int(problem_id))
+
+    def count_for(self, problem_id):
+        row = self.index_of(problem_id)
+        return None if row is None else self.counts[row]
+
+    def row(self, row):
+        problem_id = self.problem_ids[row]
+        result = {
+            "serial": self.serials[row],
+            "problem_id": str(problem_id),
+            "sih_code": f"SIH{problem_id}",
+            "title": self.titles[row],
+            "count": self.counts[row]
+        }
+        for column in self.STRING_COLUMNS:
+            result[column] = self.value(column, row)
+        return result
+
+    def _matching_codes(self, column, value):
+        wanted = value.strip().lower()
+        return {code for code, candidate in enumerate(self._values[column]) if candidate.lower() == wanted}
+
+    def query(self, organization=None, department=None, category=None, theme=None, q=None,
+              min_count=None, max_count=None, sort='serial', order='asc', offset=0, limit=50):
+        """
+        Return (total, rows) for the rows matching every given filter.
+
+        String filters are case-insensitive exact matches, resolved once to
+        codes so each row is checked with an integer comparison; ``q`` is a
+        case-insensitive substring match on the title.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+
+        rows = range(len(self))
+        filters = {'organization': organization, 'department': department, 'category': category, 'theme': theme}
+        for column, value in filters.items():
+            if value:
+                codes = self._matching_codes(column, value)
+                column_codes = self._codes[column]
+                rows = [row for row in rows if column_codes[row] in codes]
+        if min_count is not None:
+            rows = [row for row in rows if self.counts[row] >= min_count]
+        if max_count is not None:
+            rows = [row for row in rows if self.counts[row] <= max_count]
+        if q:
+            needle = q.lower()
+            rows = [row for row in rows if needle in self.titles[row].lower()]
+
+        if sort in self.STRING_COLUMNS:
+            values, codes = self._values[sort], self._codes[sort]
+            key = lambda row: values[codes[row]].lower()
+        elif sort == 'title':
+            key = lambda row: self.titles[row].lower()
+        else:
+            key = {'serial': self.serials, 'problem_id': self.problem_ids, 'count': self.counts}[sort].__getitem__
+        rows = sorted(rows, key=key, reverse=(order == 'desc'))
+
+        return len(rows), [self.row(row) for row in rows[offset:offset + limit]]
+
+    def memory_bytes(self):
+        """Approximate size of the column data (arrays, titles and dictionaries)"""
+        size = sum(column.itemsize * len(column) for column in (self.serials, self.problem_ids, self.counts))
+        size += sum(len(title) for title in self.titles)
+        for column in self.STRING_COLUMNS:
+            size += self._codes[column].itemsize * len(self._codes[column])
+            size += sum(len(value) for value in self._values[column])
+        return size
+
+    def to_dict(self):
+        """The columns as plain JSON, so the scraping worker can share the catalog with the others"""
+        return {
+            "built_at": self.built_at,
+            "rows_scanned": self.rows_scanned,
+            "rows_skipped": self.rows_skipped,
+            "serials": self.serials.tolist(),
+            "problem_ids": self.problem_ids.tolist(),
+            "counts": self.counts.tolist(),
+            "titles": self.titles,
+            "values": self._values,
+            "codes": {column: codes.tolist() for column, codes in self._codes.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a catalog from to_dict() output"""
+        catalog = cls()
+        catalog.built_at = data["built_at"]
+        catalog.rows_scanned = data.get("rows_scanned", 0)
+        catalog.rows_skipped = data.get("rows_skipped", 0)
+        catalog.serials = array('i', data["serials"])
+        catalog.problem_ids = array('i', data["problem_ids"])
+        catalog.counts = array('i', data["counts"])
+        catalog.titles = list(data["titles"])
+        for column in cls.STRING_COLUMNS:
+            values = list(data["values"][column])
+            catalog._values[column] = values
+            catalog._codes[column] = array('H', data["codes"][column])
+            catalog._lookup[column] = {value: code for code, value in enumerate(values)}
+        for row, problem_id in enumerate(catalog.problem_ids):
+            catalog._index.setdefault(problem_id, row)
+        return catalog
+
+    def summary(self):
+        return {
+            "rows": len(self),
+            "rows_scanned": self.rows_scanned,
+            "rows_skipped": self.rows_skipped,
+            "built_at": self.built_at,
+            "memory_bytes": self.memory_bytes(),
+            "distinct": {column: len(self._values[column]) for column in self.STRING_COLUMNS}
+        }
+
+
+class CatalogScanner(RowScanner):
+    """Appends every complete problem row to a ProblemCatalog; never stops early"""
+
+    # The title (2) and description (5) cells hold the whole modal text and are skipped
+    WANTED_CELLS = (SERIAL_CELL, ORGANIZATION_CELL, PROBLEM_ID_CELL, TITLE_CELL, DEPARTMENT_CELL,
+                    CATEGORY_CELL, SIH_CODE_CELL, COUNT_CELL, THEME_CELL)
+
+    def __init__(self, catalog):
+        super().__init__()
+        self.catalog = catalog
+        self.rows_skipped = 0
+
+    def _text(self, index):
+        return ' '.join(''.join(self._cells.get(index, ())).split())
+
+    def row_closed(self):
+        if self._cell_index < COUNT_CELL:
+            return
+
+        # Prefer the SIH code; fall back to the digits of the Problem ID cell
+        match = SIH_CODE_PATTERN.search(self._text(SIH_CODE_CELL)) or DIGITS_PATTERN.search(self._text(PROBLEM_ID_CELL))
+        try:
+            problem_id = int(match.group(1))
+            count = int(self._text(COUNT_CELL))
+        except (AttributeError, ValueError):
+            self.rows_skipped += 1
+            return
+
+        try:
+            serial = int(self._text(SERIAL_CELL))
+        except ValueError:
+            serial = len(self.catalog) + 1
+
+        self.catalog.append(
+            serial, problem_id, self._text(TITLE_CELL), count,
+            organization=self._text(ORGANIZATION_CELL),
+            department=self._text(DEPARTMENT_CELL),
+            category=self._text(CATEGORY_CELL),
+            theme=self._text(THEME_CELL)
+        )
+
+
+def build_catalog(html_content, chunk_size=CHUNK_SIZE):
+    """Scan the whole page and return its ProblemCatalog"""
+    catalog = ProblemCatalog()
+    scanner = CatalogScanner(catalog)
+    for start in range(0, len(html_content), chunk_size):
+        scanner.feed(html_content[start:start + chunk_size])
+    scanner.close()
+    catalog.rows_scanned = scanner.rows_scanned
+    catalog.rows_skipped = scanner.rows_skipped
+    return catalog
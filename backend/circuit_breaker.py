@@ -0,0 +1,210 @@
+"""
+Circuit breaker around the upstream fetch, so a 403 block is not hammered.
+
+- closed: requests go out as usual; ``failure_threshold`` 403s in a row
+  open the breaker.
+- open: every fetch fails at once with CircuitOpen until the cool-down has
+  passed, so callers answer from the last good state instead of sleeping
+  through retries.
+- half-open: after the cool-down exactly one caller, in any process, sends a
+  single probe request. Success closes the breaker; a failed probe opens it
+  again with the cool-down doubled, up to ``max_cooldown``.
+
+The breaker is one row in a SQLite database, so every app worker, the
+sih_monitor.py daemon and the one-shot CI run see the same state.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS breakers (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL,
+    cooldown REAL NOT NULL,
+    opened_at REAL,
+    retry_at REAL,
+    trips INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of fetching while the breaker is open or another caller is probing"""
+
+    def __init__(self, retry_at):
+        self.retry_at = retry_at
+        super().__init__(
+            "403 Forbidden: upstream is blocking requests; circuit breaker open until "
+            f"{datetime.fromtimestamp(retry_at).strftime('%H:%M:%S')}"
+        )
+
+
+class CircuitBreaker:
+    """
+    Shared closed / open / half-open breaker; ``state`` is the last state this process saw.
+
+    ``on_change(state)`` is called after every update this process makes to the
+    breaker row, and when it notices another process has closed the breaker.
+    """
+
+    def __init__(self, path='monitor_circuit.db', name='upstream', failure_threshold=3,
+                 cooldown=1800, max_cooldown=6 * 3600, probe_timeout=300, on_change=None):
+        self.path = path
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+        # A probe whose process died is given up on after this long
+        self.probe_timeout = probe_timeout
+        self.on_change = on_change
+        self.state = CLOSED
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT OR IGNORE INTO breakers (name, state, failures, cooldown) VALUES (?, ?, 0, ?)",
+            (self.name, CLOSED, self.cooldown)
+        )
+
+    @classmethod
+    def from_config(cls, path, config, on_change=None):
+        """Build from the "circuit_breaker" config section (minutes, see CONFIG_README.md)"""
+        config = config or {}
+        return cls(
+            path,
+            failure_threshold=config.get('failure_threshold', 3),
+            cooldown=config.get('cooldown_minutes', 30) * 60,
+            max_cooldown=config.get('max_cooldown_minutes', 360) * 60,
+            on_change=on_change
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit, so transitions can take the write lock up front with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, conn):
+        return conn.execute(
+            "SELECT state, failures, cooldown, opened_at, retry_at, trips FROM breakers WHERE name = ?",
+            (self.name,)
+        ).fetchone()
+
+    def _transition(self, update):
+        """Run ``update(row, now)`` in a write transaction; it returns the new column values or None"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._read(conn)
+            changes = update(row, now)
+            if changes:
+                assignments = ', '.join(f"{column} = ?" for column in changes)
+                conn.execute(f"UPDATE breakers SET {assignments} WHERE name = ?", (*changes.values(), self.name))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        previous, self.state = self.state, (changes or {}).get('state', row[0])
+        # Also on a failure count change while closed, which shows up in status()
+        if (changes or self.state != previous) and self.on_change:
+            self.on_change(self.state)
+        return row, now
+
+    def before_request(self):
+        """
+        Call before fetching. Returns True if this call is the half-open probe
+        (send one request, no retries), False when closed; raises CircuitOpen otherwise.
+        """
+        row = self._read(self._connect())
+        if row[0] == CLOSED:
+            if self.state != CLOSED:
+                self.state = CLOSED
+                if self.on_change:
+                    self.on_change(CLOSED)
+            return False
+
+        claimed = {}
+
+        def claim_probe(row, now):
+            if row[0] == CLOSED or row[4] is None or now < row[4]:
+                return None
+            # Cool-down over (or the last probe never reported back): this caller probes
+            claimed['probe'] = True
+            logger.info("Circuit breaker half-open: sending one probe request")
+            return {'state': HALF_OPEN, 'retry_at': now + self.probe_timeout}
+
+        row, _ = self._transition(claim_probe)
+        if claimed:
+            return True
+        if row[0] == CLOSED:
+            return False
+        raise CircuitOpen(row[4])
+
+    def release_probe(self):
+        """Give back a probe claimed by before_request() that was never sent; the next caller probes"""
+        def release(row, now):
+            if row[0] != HALF_OPEN:
+                return None
+            return {'state': OPEN, 'retry_at': now}
+
+        self._transition(release)
+
+    def record_success(self):
+        """The site answered normally: close the breaker"""
+        if self.state == CLOSED and self._read(self._connect())[:2] == (CLOSED, 0):
+            return
+
+        def close(row, now):
+            if row[0] != CLOSED:
+                logger.info("Circuit breaker closed: upstream is answering again")
+            return {'state': CLOSED, 'failures': 0, 'cooldown': self.cooldown, 'opened_at': None, 'retry_at': None}
+
+        self._transition(close)
+
+    def record_failure(self):
+        """Count a 403 (or a failed probe); returns the breaker state afterwards"""
+        def fail(row, now):
+            state, failures, cooldown = row[0], row[1] + 1, row[2]
+            if state == HALF_OPEN:
+                cooldown = min(cooldown * 2, self.max_cooldown)
+            elif state == OPEN or failures < self.failure_threshold:
+                return {'failures': failures}
+            else:
+                cooldown = self.cooldown
+            logger.warning(f"Circuit breaker open for {cooldown / 60:.0f} minutes after {failures} failure(s)")
+            return {'state': OPEN, 'failures': failures, 'cooldown': cooldown,
+                    'opened_at': now, 'retry_at': now + cooldown, 'trips': row[5] + 1}
+
+        self._transition(fail)
+        return self.state
+
+    def status(self):
+        """The shared breaker state for /api/count and /api/debug"""
+        state, failures, cooldown, opened_at, retry_at, trips = self._read(self._connect())
+        return {
+            "state": state,
+            "failures": failures,
+            "failure_threshold": self.failure_threshold,
+            "cooldown_seconds": round(cooldown),
+            "opened_at": datetime.fromtimestamp(opened_at).isoformat() if opened_at else None,
+            # Next probe while open; when an in-flight probe is given up on while half-open
+            "retry_at": datetime.fromtimestamp(retry_at).isoformat() if retry_at else None,
+            "trips": trips
+        }
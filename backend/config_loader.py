@@ -1,6 +1,57 @@
 import os
 import json
 
+def load_digest_config(prefix):
+    """Digest settings for one channel, e.g. EMAIL_DIGEST_MINUTES=15 (0 sends every change on its own)"""
+    window_minutes = int(os.getenv(f'{prefix}_DIGEST_MINUTES', '0'))
+    return {
+        "enabled": window_minutes > 0,
+        "window_minutes": window_minutes,
+        "max_events": int(os.getenv(f'{prefix}_DIGEST_MAX_EVENTS', '20'))
+    }
+
+def load_archive_config():
+    """Raw page archive settings, e.g. PAGE_ARCHIVE_ENABLED=true PAGE_ARCHIVE_MAX_MB=200"""
+    return {
+        "enabled": os.getenv('PAGE_ARCHIVE_ENABLED', 'false').lower() == 'true',
+        "directory": os.getenv('PAGE_ARCHIVE_DIR', 'page_archive'),
+        "max_mb": int(os.getenv('PAGE_ARCHIVE_MAX_MB', '200'))
+    }
+
+def load_schedule_config():
+    """Adaptive polling settings, e.g. SCHEDULE_MIN_MINUTES=10 SCHEDULE_MAX_REQUESTS_PER_HOUR=6"""
+    return {
+        "min_minutes": float(os.getenv('SCHEDULE_MIN_MINUTES', '10')),
+        "base_minutes": float(os.getenv('SCHEDULE_BASE_MINUTES', '60')),
+        "max_minutes": float(os.getenv('SCHEDULE_MAX_MINUTES', '240')),
+        "blocked_max_minutes": float(os.getenv('SCHEDULE_BLOCKED_MAX_MINUTES', '720')),
+        "max_requests_per_hour": int(os.getenv('SCHEDULE_MAX_REQUESTS_PER_HOUR', '6')),
+        "jitter": float(os.getenv('SCHEDULE_JITTER', '0.1'))
+    }
+
+def load_circuit_breaker_config():
+    """403 circuit breaker settings, e.g. CIRCUIT_FAILURE_THRESHOLD=3 CIRCUIT_COOLDOWN_MINUTES=30"""
+    return {
+        "failure_threshold": int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3')),
+        "cooldown_minutes": float(os.getenv('CIRCUIT_COOLDOWN_MINUTES', '30')),
+        "max_cooldown_minutes": float(os.getenv('CIRCUIT_MAX_COOLDOWN_MINUTES', '360'))
+    }
+
+def load_governor_config():
+    """Shared upstream request budget, e.g. GOVERNOR_REQUESTS_PER_HOUR=20 GOVERNOR_BURST=5"""
+    return {
+        "requests_per_hour": float(os.getenv('GOVERNOR_REQUESTS_PER_HOUR', '20')),
+        "burst": int(os.getenv('GOVERNOR_BURST', '5')),
+        "max_wait_seconds": float(os.getenv('GOVERNOR_MAX_WAIT_SECONDS', '120'))
+    }
+
+def load_fetch_config():
+    """Download settings, e.g. FETCH_EARLY_STOP=false CATALOG_MAX_AGE_MINUTES=60"""
+    return {
+        "early_stop": os.getenv('FETCH_EARLY_STOP', 'true').lower() == 'true',
+        "catalog_max_age_minutes": float(os.getenv('CATALOG_MAX_AGE_MINUTES', '60'))
+    }
+
 def load_config():
     """Load configuration from environment variables or config file"""
     
@@ -14,17 +65,25 @@ def load_config():
                 "enabled": os.getenv('EMAIL_ENABLED', 'true').lower() == 'true',
                 "smtp_server": os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
                 "smtp_port": int(os.getenv('SMTP_PORT', '587')),
+                "starttls": os.getenv('SMTP_STARTTLS', 'true').lower() == 'true',
                 "sender_email": os.getenv('SENDER_EMAIL'),
                 "sender_password": os.getenv('SENDER_PASSWORD'),
-                "recipient_email": os.getenv('RECIPIENT_EMAIL')
+                "recipient_email": os.getenv('RECIPIENT_EMAIL'),
+                "digest": load_digest_config('EMAIL')
             },
             "whatsapp": {
                 "enabled": os.getenv('WHATSAPP_ENABLED', 'true').lower() == 'true',
                 "twilio_sid": os.getenv('TWILIO_SID'),
                 "twilio_token": os.getenv('TWILIO_TOKEN'),
                 "from_number": os.getenv('TWILIO_FROM_NUMBER'),
-                "to_number": os.getenv('TWILIO_TO_NUMBER')
-            }
+                "to_number": os.getenv('TWILIO_TO_NUMBER'),
+                "digest": load_digest_config('WHATSAPP')
+            },
+            "archive": load_archive_config(),
+            "schedule": load_schedule_config(),
+            "circuit_breaker": load_circuit_breaker_config(),
+            "governor": load_governor_config(),
+            "fetch": load_fetch_config()
         }
         
         # Validate required environment variables
@@ -48,16 +107,30 @@ def load_config():
         except FileNotFoundError:
             raise FileNotFoundError("config.json not found. Please create it or set environment variables.")
 
+def parse_problem_ids(value):
+    """Normalise a problem ID setting (single ID, comma-separated string or list) to a list of IDs"""
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = str(value).split(',')
+    
+    problem_ids = []
+    for item in items:
+        problem_id = str(item).strip()
+        if problem_id and problem_id not in problem_ids:
+            problem_ids.append(problem_id)
+    return problem_ids
+
 def load_problem_config():
     """Load problem configuration from environment or file"""
     
     # Check if problem ID is set via environment variable
-    problem_id = os.getenv('PROBLEM_ID')
+    problem_ids = parse_problem_ids(os.getenv('PROBLEM_ID', ''))
     
-    if problem_id:
+    if problem_ids:
         return {
-            "problem_statement_id": problem_id,
-            "description": f"SIH 2025 Problem Statement ID {problem_id} (from environment)",
+            "problem_statement_id": problem_ids if len(problem_ids) > 1 else problem_ids[0],
+            "description": f"SIH 2025 Problem Statement ID {', '.join(problem_ids)} (from environment)",
             "last_updated": "2025-09-18",
             "notes": "Configured via PROBLEM_ID environment variable"
         }
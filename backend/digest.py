@@ -0,0 +1,77 @@
+"""
+Digest batching for count-change notifications.
+
+Instead of one message per change, a DigestBuffer collects changes for a
+channel until its window expires or it holds ``max_events`` changes, then
+hands the whole batch to a send callback as a single combined message.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class DigestBuffer:
+    """Coalesces count changes per problem ID and flushes them as one batch"""
+
+    def __init__(self, send, window_seconds=900, max_events=20):
+        self.send = send
+        self.window_seconds = window_seconds
+        self.max_events = max_events
+        self._changes = OrderedDict()
+        self._events = 0
+        self._opened_at = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, problem_id, previous_count, current_count):
+        """Record a change; sends the batch right away once it holds max_events changes"""
+        batch = None
+        with self._lock:
+            change = self._changes.get(problem_id)
+            if change is None:
+                self._changes[problem_id] = {
+                    "problem_id": problem_id,
+                    "before": previous_count,
+                    "after": current_count
+                }
+            else:
+                # Keep the count from before the window and the latest one
+                change["after"] = current_count
+            self._events += 1
+
+            if self._events >= self.max_events:
+                batch = self._take()
+            elif self._timer is None:
+                self._opened_at = time.time()
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            self.send(batch)
+
+    def flush(self):
+        """Send whatever has been collected so far"""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self.send(batch)
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = list(self._changes.values())
+        self._changes.clear()
+        self._events = 0
+        self._opened_at = None
+        return batch
+
+    def pending(self):
+        with self._lock:
+            return {
+                "changes": len(self._changes),
+                "events": self._events,
+                "window_opened_at": self._opened_at
+            }
@@ -0,0 +1,140 @@
+"""
+Server-Sent Events fan-out for state changes.
+
+app.py publishes an event each time update_submission_count commits a new
+state; every /api/stream subscriber gets it from its own bounded queue. The
+last few events are kept so a reconnecting client that sends Last-Event-ID
+is replayed what it missed, and idle connections get a comment heartbeat so
+proxies do not close them.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+
+class TooManySubscribers(Exception):
+    """Raised by subscribe() when the subscriber cap has been reached"""
+
+
+class Subscriber:
+    """One connected client's queue of pending events"""
+
+    def __init__(self, max_pending):
+        self.queue = queue.Queue(max_pending)
+        self.connected_at = time.time()
+        self.dropped = False
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A client this far behind is disconnected and resumes from Last-Event-ID
+            self.dropped = True
+
+
+class EventBroadcaster:
+    """Publishes events to a capped set of subscribers and keeps a short replay buffer"""
+
+    def __init__(self, max_subscribers=50, replay_size=100, max_pending=20, heartbeat_seconds=15):
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_pending = max_pending
+        self.published = 0
+        self.rejected = 0
+        # Event IDs are only meaningful within one process lifetime
+        self._stream_id = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._replay = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        """Send ``data`` (JSON-serializable) to every subscriber as an ``event_type`` event"""
+        with self._lock:
+            self._sequence += 1
+            self.published += 1
+            event = (f"{self._stream_id}-{self._sequence}", event_type, json.dumps(data, sort_keys=True))
+            self._replay.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a subscriber; returns (subscriber, missed events).
+
+        ``missed`` is the events after ``last_event_id`` when it is still in
+        the replay buffer, or None when the client needs a fresh snapshot
+        (first connection, server restart or too far behind).
+        """
+        subscriber = Subscriber(self.max_pending)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                raise TooManySubscribers(f"{self.max_subscribers} subscribers already connected")
+            self._subscribers.add(subscriber)
+            missed = self._missed_since(last_event_id)
+        return subscriber, missed
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _missed_since(self, last_event_id):
+        if not last_event_id:
+            return None
+        stream_id, _, sequence = last_event_id.partition('-')
+        if stream_id != self._stream_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence == self._sequence:
+            return []
+        if not self._replay or sequence < int(self._replay[0][0].rsplit('-', 1)[1]) - 1:
+            return None
+        return [event for event in self._replay if int(event[0].rsplit('-', 1)[1]) > sequence]
+
+    def stream(self, subscriber, missed, snapshot):
+        """
+        Yield the SSE wire format for one subscriber until it disconnects.
+
+        ``snapshot`` is called for the current state when the client cannot
+        be resumed from ``missed``.
+        """
+        try:
+            yield f"retry: {self.heartbeat_seconds * 1000}\n\n"
+            if missed is None:
+                with self._lock:
+                    last_id = f"{self._stream_id}-{self._sequence}"
+                yield format_event((last_id, 'snapshot', json.dumps(snapshot(), sort_keys=True)))
+            else:
+                for event in missed:
+                    yield format_event(event)
+
+            while not subscriber.dropped:
+                try:
+                    event = subscriber.queue.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "published": self.published,
+                "rejected": self.rejected,
+                "last_event_id": f"{self._stream_id}-{self._sequence}"
+            }
+
+
+def format_event(event):
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
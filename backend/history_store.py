@@ -0,0 +1,158 @@
+"""
+Append-only time series of every check, kept in SQLite (WAL mode).
+
+Each check appends one row per watched problem ID: timestamp, problem ID,
+count, fetch latency and status. Reads go through an index on
+(problem_id, ts) and stream from the cursor, so months of hourly data never
+have to be loaded into memory at once.
+
+Whole-catalog snapshots (every problem's count at one point in time) are kept
+alongside as packed int32 arrays, one row per changed page.
+"""
+
+import sqlite3
+import threading
+import time
+from array import array
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    ts REAL NOT NULL,
+    problem_id TEXT NOT NULL,
+    count INTEGER,
+    latency_ms REAL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_problem_ts ON observations (problem_id, ts);
+CREATE INDEX IF NOT EXISTS idx_observations_ts ON observations (ts);
+CREATE TABLE IF NOT EXISTS catalog_snapshots (
+    ts REAL PRIMARY KEY,
+    problem_ids BLOB NOT NULL,
+    counts BLOB NOT NULL
+);
+"""
+
+
+class HistoryStore:
+    """SQLite-backed observation log with indexed range queries and server-side downsampling"""
+
+    def __init__(self, path='monitor_history.db'):
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections are per thread; the scheduler, refresh jobs and
+        # request handlers each get their own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, counts, latency_ms=None, status='ok', ts=None):
+        """Append one observation per problem ID in ``counts`` (ID -> count or None)"""
+        ts = time.time() if ts is None else ts
+        rows = [(ts, str(problem_id), count, latency_ms, status) for problem_id, count in counts.items()]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO observations (ts, problem_id, count, latency_ms, status) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def iter_range(self, problem_id, start=None, end=None):
+        """Yield (ts, count, latency_ms, status) rows in time order without loading them all"""
+        start = 0 if start is None else start
+        end = time.time() if end is None else end
+        cursor = self._connect().execute(
+            "SELECT ts, count, latency_ms, status FROM observations "
+            "WHERE problem_id = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (str(problem_id), start, end)
+        )
+        for row in cursor:
+            yield row
+
+    def iter_since(self, start):
+        """Yield (ts, problem_id, count, status) for every ID since ``start``, in time order"""
+        cursor = self._connect().execute(
+            "SELECT ts, problem_id, count, status FROM observations WHERE ts >= ? ORDER BY ts, rowid",
+            (start,)
+        )
+        for row in cursor:
+            yield row
+
+    def downsample(self, problem_id, start=None, end=None, points=200):
+        """
+        Aggregate a range into at most ``points`` equal-width buckets inside SQLite.
+
+        Returns dicts with the bucket's time span, min/max/avg count, number of
+        samples and how many of those were failed checks.
+        """
+        end = time.time() if end is None else end
+        if start is None:
+            row = self._connect().execute(
+                "SELECT MIN(ts) FROM observations WHERE problem_id = ?", (str(problem_id),)
+            ).fetchone()
+            start = row[0] if row and row[0] is not None else end
+        points = max(points, 1)
+        width = max((end - start) / points, 1e-6)
+
+        cursor = self._connect().execute(
+            "SELECT MIN(CAST((ts - ?) / ? AS INTEGER), ?) AS bucket, MIN(ts), MAX(ts), "
+            "MIN(count), MAX(count), AVG(count), COUNT(*), "
+            "SUM(CASE WHEN status IN ('ok', 'unchanged') THEN 0 ELSE 1 END) "
+            "FROM observations WHERE problem_id = ? AND ts >= ? AND ts <= ? "
+            "GROUP BY bucket ORDER BY bucket",
+            (start, width, points - 1, str(problem_id), start, end)
+        )
+        for _, first_ts, last_ts, min_count, max_count, avg_count, samples, errors in cursor:
+            yield {
+                "from": first_ts,
+                "to": last_ts,
+                "min": min_count,
+                "max": max_count,
+                "avg": avg_count,
+                "samples": samples,
+                "errors": errors
+            }
+
+    def record_snapshot(self, problem_ids, counts, ts=None):
+        """Store a full-catalog snapshot given as two parallel array('i') columns"""
+        ts = time.time() if ts is None else ts
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO catalog_snapshots (ts, problem_ids, counts) VALUES (?, ?, ?)",
+                (ts, problem_ids.tobytes(), counts.tobytes())
+            )
+
+    def snapshot_at(self, ts):
+        """
+        Return (ts, problem_ids, counts) for the latest snapshot taken at or
+        before ``ts``, or the oldest one if none is that old; None when empty.
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT ts, problem_ids, counts FROM catalog_snapshots WHERE ts <= ? ORDER BY ts DESC LIMIT 1",
+            (ts,)
+        ).fetchone() or conn.execute(
+            "SELECT ts, problem_ids, counts FROM catalog_snapshots ORDER BY ts LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], array('i', row[1]), array('i', row[2])
+
+    def latest_snapshot(self):
+        return self.snapshot_at(float('inf'))
+
+    def prune_snapshots(self, before):
+        """Drop snapshots older than ``before``, keeping the newest of them as a baseline"""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "DELETE FROM catalog_snapshots WHERE ts < (SELECT MAX(ts) FROM catalog_snapshots WHERE ts < ?)",
+                (before,)
+            )
@@ -0,0 +1,84 @@
+"""
+Process-wide pooled HTTP session shared by the scheduler and the API endpoints.
+
+Keeping one requests.Session alive means TCP/TLS connections are reused between
+checks and the site's cookies survive from one check to the next.
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionManager:
+    """Owns a single long-lived requests.Session with a tuned connection pool"""
+
+    def __init__(self, pool_connections=4, pool_maxsize=8):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._adapter = None
+        self._lock = threading.Lock()
+        self.sessions_created = 0
+        self.requests_sent = 0
+
+    def get_session(self, configure=None):
+        """
+        Return the shared session, creating it on first use.
+
+        ``configure`` is called once with the new session to set headers and proxies.
+        """
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                self._adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=False
+                )
+                session.mount('https://', self._adapter)
+                session.mount('http://', self._adapter)
+                session.hooks['response'].append(self._count_response)
+                if configure:
+                    configure(session)
+                self._session = session
+                self.sessions_created += 1
+            return self._session
+
+    def _count_response(self, response, *args, **kwargs):
+        with self._lock:
+            self.requests_sent += 1
+
+    def reset(self):
+        """Drop the shared session (connections and cookies); the next call builds a fresh one"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+    def stats(self):
+        """Connection reuse figures taken from the underlying urllib3 pools"""
+        with self._lock:
+            handshakes = 0
+            pooled_requests = 0
+            if self._adapter is not None:
+                pools = self._adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    handshakes += pool.num_connections
+                    pooled_requests += pool.num_requests
+
+            return {
+                "sessions_created": self.sessions_created,
+                "requests_sent": self.requests_sent,
+                "connections_opened": handshakes,
+                "connections_reused": max(pooled_requests - handshakes, 0),
+                "cookies": len(self._session.cookies) if self._session is not None else 0
+            }
+
+
+# Shared by every caller in this process
+session_manager = SessionManager()
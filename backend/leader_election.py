@@ -0,0 +1,253 @@
+"""
+Single-leader election between processes on one host, through a SQLite lease.
+
+Every gunicorn worker runs a LeaderElection. The worker holding the lease
+(renewed every ``heartbeat`` seconds, valid for ``ttl``) is the only one that
+scrapes upstream; if it dies, its lease expires and another worker takes over
+on its next tick. Followers hand manual refreshes to the leader through the
+refresh_requests table and wait for the result, so upstream load does not
+grow with the number of HTTP workers. A request the leader claimed but never
+finished (it died or lost the lease) goes back to pending for the next one.
+Every worker also records its refresh
+jobs in refresh_jobs, so a job can be polled through whichever worker the
+next request lands on.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    acquired_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refresh_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    requested_by TEXT NOT NULL,
+    requested_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    finished_at REAL,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE TABLE IF NOT EXISTS refresh_jobs (
+    id TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Added after the first release; databases created before then get them on open
+REQUEST_CLAIM_COLUMNS = (('claimed_by', 'TEXT'), ('claimed_at', 'REAL'))
+
+
+class LeaderElection:
+    """Holds or watches the named lease from a background thread and reports transitions"""
+
+    def __init__(self, path='monitor_leader.db', name='scraper', ttl=30, heartbeat=10, tick=1,
+                 on_elected=None, on_demoted=None, on_tick=None, on_refresh_requested=None, claim_timeout=300):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.tick = tick
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_tick = on_tick
+        self.on_refresh_requested = on_refresh_requested
+        # A claimed request still running after this long is handed out again
+        self.claim_timeout = claim_timeout
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.elections = 0
+        self._leader_until = 0
+        self._last_renewal = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread = None
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(refresh_requests)")}
+        for name, kind in REQUEST_CLAIM_COLUMNS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE refresh_requests ADD COLUMN {name} {kind}")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit, so the lease update can take the write lock up front with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def is_leader(self):
+        """True only while this process holds an unexpired lease"""
+        return time.time() < self._leader_until
+
+    def start(self):
+        """Try for the lease once right away (a lone worker leads immediately), then keep ticking"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='leader-election', daemon=True)
+        self._step()
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self._step()
+            except sqlite3.Error as e:
+                logger.error(f"Leader election tick failed: {e}")
+            except Exception:
+                # Never let the thread die: a worker that stops ticking silently stops renewing or following
+                logger.exception("Leader election tick failed")
+
+    def _step(self):
+        was_leader = self.is_leader
+        now = time.time()
+        if now - self._last_renewal >= self.heartbeat or not was_leader:
+            self._try_acquire(now)
+
+        leader = self.is_leader
+        if leader and not was_leader:
+            self.elections += 1
+            logger.info(f"{self.holder_id} is now the scraping leader")
+            self._call(self.on_elected)
+        elif was_leader and not leader:
+            logger.warning(f"{self.holder_id} lost the scraping lease")
+            self._call(self.on_demoted)
+
+        if leader and self.on_refresh_requested:
+            pending = self._claim_requests()
+            if pending:
+                self._call(self.on_refresh_requested, pending)
+        self._call(self.on_tick, leader)
+
+    def _call(self, callback, *args):
+        """Run a callback; whatever it raises is logged, so the lease keeps being renewed and watched"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception(f"Leader election callback {getattr(callback, '__name__', callback)} failed")
+
+    def _try_acquire(self, now):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT holder, acquired_at, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+            if row is None or row[0] == self.holder_id or row[2] < now:
+                acquired_at = row[1] if row is not None and row[0] == self.holder_id else now
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (name, holder, acquired_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.name, self.holder_id, acquired_at, now + self.ttl)
+                )
+                conn.execute("COMMIT")
+                self._leader_until = now + self.ttl
+                self._last_renewal = now
+                return True
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return False
+
+    def release(self):
+        """Give the lease up (e.g. at shutdown) so another worker can take over at once"""
+        if not self.is_leader:
+            return
+        self._leader_until = 0
+        self._connect().execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder_id))
+
+    def request_refresh(self):
+        """Ask the leader for a refresh; returns the request ID to wait on"""
+        cursor = self._connect().execute(
+            "INSERT INTO refresh_requests (requested_by, requested_at) VALUES (?, ?)",
+            (self.holder_id, time.time())
+        )
+        return cursor.lastrowid
+
+    def wait_for_request(self, request_id, timeout, poll=0.5):
+        """Wait for the leader to finish a request; returns True/False for its outcome, None on timeout"""
+        deadline = time.monotonic() + timeout
+        conn = self._connect()
+        while time.monotonic() < deadline:
+            row = conn.execute("SELECT status FROM refresh_requests WHERE id = ?", (request_id,)).fetchone()
+            if row is not None and row[0] in ('succeeded', 'failed'):
+                return row[0] == 'succeeded'
+            time.sleep(poll)
+        return None
+
+    def _claim_requests(self):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Only the lease holder claims, so a running request claimed by anyone else was
+            # orphaned by a previous leader; ours are retried once they run past the timeout
+            conn.execute(
+                "UPDATE refresh_requests SET status = 'pending', claimed_by = NULL, claimed_at = NULL "
+                "WHERE status = 'running' AND (claimed_by IS NOT ? OR claimed_at < ?)",
+                (self.holder_id, now - self.claim_timeout)
+            )
+            ids = [row[0] for row in conn.execute("SELECT id FROM refresh_requests WHERE status = 'pending'")]
+            if ids:
+                conn.executemany(
+                    "UPDATE refresh_requests SET status = 'running', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                    [(self.holder_id, now, i) for i in ids]
+                )
+            # Keep a day of finished requests and jobs for debugging
+            conn.execute("DELETE FROM refresh_requests WHERE finished_at < ?", (time.time() - 86400,))
+            conn.execute("DELETE FROM refresh_jobs WHERE updated_at < ?", (time.time() - 86400,))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return ids
+
+    def finish_requests(self, request_ids, success):
+        """Mark delegated requests done so the waiting followers return"""
+        self._connect().executemany(
+            "UPDATE refresh_requests SET status = ?, finished_at = ? WHERE id = ?",
+            [('succeeded' if success else 'failed', time.time(), request_id) for request_id in request_ids]
+        )
+
+    def save_job(self, record):
+        """Store a refresh job's status (RefreshJob.to_dict()) for the other workers"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO refresh_jobs (id, body, updated_at) VALUES (?, ?, ?)",
+            (record["id"], json.dumps(record), time.time())
+        )
+
+    def load_job(self, job_id):
+        """A refresh job recorded by any worker, or None"""
+        row = self._connect().execute("SELECT body FROM refresh_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self):
+        row = self._connect().execute(
+            "SELECT holder, acquired_at, expires_at FROM leases WHERE name = ?", (self.name,)
+        ).fetchone()
+        return {
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "elections": self.elections,
+            "leader": row[0] if row else None,
+            "leader_since": row[1] if row else None,
+            "lease_expires_in": round(row[2] - time.time(), 1) if row else None
+        }
@@ -0,0 +1,129 @@
+"""
+Snapshot diffs and "top movers" across the whole problem catalog.
+
+Every changed page becomes a snapshot of two parallel int32 columns (problem
+ID, count) in the history database. Diffing two snapshots never walks Python
+dicts row by row: when both pages list the problems in the same order (the
+normal case) the count columns are subtracted element-wise with map(), and
+otherwise the old counts are re-aligned to the new order in one pass first.
+"""
+
+import heapq
+import logging
+import operator
+import re
+import time
+from array import array
+from itertools import compress, repeat
+
+logger = logging.getLogger(__name__)
+
+WINDOW_PATTERN = re.compile(r'^(\d+)([mhd])$')
+WINDOW_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(value):
+    """Turn '1h', '24h', '30m' or '7d' into seconds"""
+    match = WINDOW_PATTERN.match((value or '').strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"window must look like 1h, 24h, 30m or 7d, not {value!r}")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+def diff_counts(old_ids, old_counts, new_ids, new_counts):
+    """
+    Return (bases, deltas) aligned with ``new_ids``.
+
+    ``bases`` holds each problem's old count; problems that were not in the
+    old snapshot get their new count as base, i.e. a delta of 0.
+    """
+    if old_ids == new_ids:
+        bases = old_counts
+    else:
+        lookup = dict(zip(old_ids, old_counts))
+        bases = array('i', map(lookup.get, new_ids, new_counts))
+    deltas = array('i', map(operator.sub, new_counts, bases))
+    return bases, deltas
+
+
+def top_movers(problem_ids, bases, deltas, limit=10):
+    """Largest absolute and relative growth, each as a list of dicts"""
+    growing = list(compress(range(len(deltas)), map(operator.gt, deltas, repeat(0))))
+    # Relative growth against a base of at least 1, so 0 -> 3 counts as +300%
+    ratios = dict(zip(growing, map(operator.truediv, map(deltas.__getitem__, growing),
+                                   map(max, map(bases.__getitem__, growing), repeat(1)))))
+
+    def mover(row):
+        return {
+            "problem_id": str(problem_ids[row]),
+            "before": bases[row],
+            "after": bases[row] + deltas[row],
+            "change": deltas[row],
+            "growth": round(ratios[row], 4)
+        }
+
+    return {
+        "absolute": [mover(row) for row in heapq.nlargest(limit, growing, key=deltas.__getitem__)],
+        "relative": [mover(row) for row in heapq.nlargest(limit, growing, key=ratios.__getitem__)]
+    }
+
+
+class MoversTracker:
+    """Records catalog snapshots and answers "what moved in the last N hours" from them"""
+
+    def __init__(self, history, retention_seconds=7 * 86400):
+        self.history = history
+        self.retention_seconds = retention_seconds
+        self.last_diff_ms = None
+        self._latest = None
+
+    def latest(self):
+        if self._latest is None:
+            self._latest = self.history.latest_snapshot()
+        return self._latest
+
+    def record(self, catalog, ts=None):
+        """
+        Diff ``catalog`` against the previous snapshot and store it if any count
+        changed; returns the number of problems whose count changed.
+        """
+        ts = time.time() if ts is None else ts
+        problem_ids, counts = catalog.problem_ids, catalog.counts
+        previous = self.latest()
+
+        started = time.perf_counter()
+        if previous is not None:
+            _, deltas = diff_counts(previous[1], previous[2], problem_ids, counts)
+            changed = len(deltas) - deltas.count(0)
+        else:
+            changed = len(counts)
+        self.last_diff_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        if previous is not None and not changed and previous[1] == problem_ids:
+            return 0
+
+        snapshot = (ts, array('i', problem_ids), array('i', counts))
+        self.history.record_snapshot(snapshot[1], snapshot[2], ts)
+        self.history.prune_snapshots(ts - self.retention_seconds)
+        self._latest = snapshot
+        logger.info(f"Catalog snapshot: {changed} of {len(counts)} problems changed (diff {self.last_diff_ms} ms)")
+        return changed
+
+    def movers(self, window_seconds, limit=10, now=None):
+        """Top movers between the snapshot in effect ``window_seconds`` ago and the latest one"""
+        # Read from the database so snapshots recorded by another process are seen
+        latest = self.history.latest_snapshot()
+        if latest is None:
+            return None
+        now = time.time() if now is None else now
+        baseline = self.history.snapshot_at(now - window_seconds)
+
+        started = time.perf_counter()
+        bases, deltas = diff_counts(baseline[1], baseline[2], latest[1], latest[2])
+        result = top_movers(latest[1], bases, deltas, limit)
+        result["diff_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        result["baseline_at"] = baseline[0]
+        result["current_at"] = latest[0]
+        result["changed"] = len(deltas) - deltas.count(0)
+        result["problems"] = len(deltas)
+        return result
@@ -0,0 +1,321 @@
+"""
+Background notification dispatcher.
+
+Notifications are written to a durable SQLite outbox and handed to worker
+threads through a bounded queue, so sending never blocks the scrape pipeline.
+Failed deliveries are retried with exponential backoff; anything still pending
+when the process stops is picked up again on the next start.
+
+Several processes may share one outbox (the web app and sih_monitor.py, or
+an old and a new scraping leader). A worker claims an entry before sending it,
+so each notification is sent by one process; a claim whose process died is
+released after ``claim_timeout`` seconds.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+# Added after the first release; outboxes created before then get them on open
+OUTBOX_CLAIM_COLUMNS = (('claimed_by', 'TEXT'), ('claimed_at', 'REAL'))
+
+
+class SMTPConnection:
+    """One authenticated SMTP connection, reused until it has been idle for ``idle_timeout`` seconds"""
+
+    def __init__(self, server, port, username=None, password=None, starttls=True, idle_timeout=60, timeout=30):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._smtp = None
+        self._last_used = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return smtp
+
+    def _close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except OSError:
+                # SMTPException is an OSError; the connection is going away either way,
+                # and quit() leaves the socket open when the QUIT command itself fails
+                self._smtp.close()
+            self._smtp = None
+
+    def send_message(self, msg):
+        with self._lock:
+            if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._close()
+
+            if self._smtp is None:
+                self._smtp = self._connect()
+                self._smtp.send_message(msg)
+            else:
+                try:
+                    self._smtp.send_message(msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                    # The server dropped the idle connection; reconnect once. Other SMTP errors
+                    # (refused recipients, rejected data) are not retried here: the message may
+                    # have been accepted in part, so they go to the dispatcher's backoff instead
+                    self._close()
+                    self._smtp = self._connect()
+                    self._smtp.send_message(msg)
+            self._last_used = time.monotonic()
+
+    def close_if_idle(self):
+        with self._lock:
+            if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._close()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class NotificationDispatcher:
+    """Bounded queue + worker threads delivering outbox entries through per-channel handlers"""
+
+    def __init__(self, handlers, outbox_path='notification_outbox.db', workers=2, queue_size=100,
+                 max_attempts=5, retry_base_delay=5, on_idle=None, claim_timeout=300):
+        self.handlers = handlers
+        self.outbox_path = outbox_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.on_idle = on_idle
+        self.claim_timeout = claim_timeout
+        self.claimant = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._queued_ids = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stats = {}
+        conn = self._connect()
+        conn.executescript(OUTBOX_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+        with conn:
+            for name, kind in OUTBOX_CLAIM_COLUMNS:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE outbox ADD COLUMN {name} {kind}")
+        atexit.register(self.drain, 30)
+        # Deliver what a previous run left behind now, not only once something new is enqueued
+        if self._has_pending():
+            self.start()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.outbox_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _has_pending(self):
+        return self._connect().execute("SELECT 1 FROM outbox WHERE status = 'pending' LIMIT 1").fetchone() is not None
+
+    def start(self):
+        """Start the workers and pick up anything left in the outbox by a previous run"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'notify-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._requeue_due()
+
+    def enqueue(self, channel, payload):
+        """Store a notification in the outbox and queue it for delivery; returns immediately"""
+        if channel not in self.handlers:
+            raise ValueError(f"Unknown notification channel: {channel}")
+
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (channel, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (channel, json.dumps(payload), now, now)
+            )
+        self.start()
+        self._offer(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def _offer(self, entry_id):
+        with self._lock:
+            if entry_id in self._queued_ids:
+                return
+            try:
+                self._queue.put_nowait(entry_id)
+            except queue.Full:
+                # Stays in the outbox; a worker re-queues it once the queue drains
+                logger.warning(f"Notification queue full; entry {entry_id} deferred")
+                return
+            self._queued_ids.add(entry_id)
+
+    def _requeue_due(self):
+        conn = self._connect()
+        # Entries claimed by a process that died mid-send become deliverable again
+        with conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_by = NULL, claimed_at = NULL "
+                "WHERE status = 'sending' AND claimed_at < ?",
+                (time.time() - self.claim_timeout,)
+            )
+        rows = conn.execute(
+            "SELECT id FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id",
+            (time.time(),)
+        ).fetchall()
+        for (entry_id,) in rows:
+            self._offer(entry_id)
+
+    def _worker(self):
+        while True:
+            try:
+                entry_id = self._queue.get(timeout=1)
+            except queue.Empty:
+                self._requeue_due()
+                if self.on_idle:
+                    self.on_idle()
+                continue
+
+            try:
+                self._deliver(entry_id)
+            finally:
+                with self._lock:
+                    self._queued_ids.discard(entry_id)
+                self._queue.task_done()
+
+    def _deliver(self, entry_id):
+        conn = self._connect()
+        # Claim the entry first so another process working on the same outbox does not send it too
+        with conn:
+            claimed = conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_by = ?, claimed_at = ? "
+                "WHERE id = ? AND status = 'pending'",
+                (self.claimant, time.time(), entry_id)
+            ).rowcount
+        if not claimed:
+            return
+        row = conn.execute(
+            "SELECT channel, payload, created_at, attempts FROM outbox WHERE id = ?", (entry_id,)
+        ).fetchone()
+        if row is None:
+            return
+        channel, payload, created_at, attempts = row
+
+        started = time.perf_counter()
+        try:
+            self.handlers[channel](json.loads(payload))
+        except Exception as e:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                logger.error(f"Giving up on {channel} notification {entry_id} after {attempts} attempts: {e}")
+                status, next_attempt_at = 'failed', time.time()
+            else:
+                delay = self.retry_base_delay * (2 ** (attempts - 1))
+                logger.warning(f"{channel} notification {entry_id} failed ({e}); retrying in {delay}s")
+                status, next_attempt_at = 'pending', time.time() + delay
+            with self._lock:
+                self._channel_stats(channel)["failed" if status == 'failed' else "retries"] += 1
+            with conn:
+                conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt_at = ?, status = ?, last_error = ?, "
+                    "claimed_by = NULL, claimed_at = NULL WHERE id = ?",
+                    (attempts, next_attempt_at, status, str(e), entry_id)
+                )
+            return
+
+        with conn:
+            conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+        send_ms = (time.perf_counter() - started) * 1000
+        delivery_ms = (time.time() - created_at) * 1000
+        with self._lock:
+            stats = self._channel_stats(channel)
+            stats["delivered"] += 1
+            stats["last_send_ms"] = round(send_ms, 1)
+            stats["last_delivery_ms"] = round(delivery_ms, 1)
+            stats["max_delivery_ms"] = round(max(stats["max_delivery_ms"], delivery_ms), 1)
+            stats["total_delivery_ms"] += delivery_ms
+        logger.info(f"{channel} notification {entry_id} delivered in {delivery_ms:.0f} ms")
+
+    def _channel_stats(self, channel):
+        # Callers hold self._lock
+        return self._stats.setdefault(channel, {
+            "delivered": 0,
+            "retries": 0,
+            "failed": 0,
+            "last_send_ms": None,
+            "last_delivery_ms": None,
+            "max_delivery_ms": 0,
+            "total_delivery_ms": 0
+        })
+
+    def drain(self, timeout=30):
+        """Wait up to ``timeout`` seconds for queued notifications to be delivered"""
+        if not self._threads:
+            return True
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stats(self):
+        """Outbox size plus per-channel delivery counts and latency"""
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+        ).fetchall()
+        with self._lock:
+            channels = {}
+            for channel, stats in self._stats.items():
+                channel_stats = dict(stats)
+                total = channel_stats.pop("total_delivery_ms")
+                channel_stats["avg_delivery_ms"] = round(total / stats["delivered"], 1) if stats["delivered"] else None
+                channels[channel] = channel_stats
+        return {
+            "outbox": dict(rows),
+            "queued": self._queue.qsize(),
+            "channels": channels
+        }
@@ -0,0 +1,199 @@
+"""
+Content-addressed archive of raw fetched pages.
+
+Each distinct response body is compressed (zstd when the ``zstandard``
+package is installed, gzip otherwise) and stored once under its SHA-256
+digest. Every fetch adds a row to an SQLite index mapping the fetch time to
+a blob, so an unchanged page (same digest or a 304) costs one index row and
+no new file. Once the blobs exceed ``max_bytes`` the least recently fetched
+ones are deleted together with their index rows.
+"""
+
+import gzip
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fetches (
+    ts REAL NOT NULL,
+    digest TEXT NOT NULL,
+    status_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_fetches_ts ON fetches (ts);
+CREATE INDEX IF NOT EXISTS idx_fetches_digest ON fetches (digest);
+CREATE INDEX IF NOT EXISTS idx_blobs_last_seen ON blobs (last_seen);
+"""
+
+
+def compress(data, level=None):
+    """Return (suffix, compressed bytes) using the best available codec"""
+    if zstandard is not None:
+        return '.zst', zstandard.ZstdCompressor(level=level or 10).compress(data)
+    return '.gz', gzip.compress(data, compresslevel=level or 6)
+
+
+def decompress(path, data):
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Deduplicated, size-capped store of page bodies with a fetch-time index"""
+
+    def __init__(self, directory='page_archive', max_bytes=200 * 1024 * 1024, level=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.level = level
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def store(self, body, digest, status_code=200, ts=None):
+        """
+        Record a fetch of ``body`` (bytes) whose SHA-256 hex digest is ``digest``.
+
+        Returns True when a new blob was written, False when the body was
+        already archived and only the index was updated.
+        """
+        ts = time.time() if ts is None else ts
+        conn = self._connect()
+        with self._lock:
+            known = conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if known is None:
+                suffix, data = compress(body, self.level)
+                path = os.path.join(self.directory, 'blobs', digest[:2], digest + suffix)
+                self._write(path, data)
+                with conn:
+                    conn.execute(
+                        "INSERT INTO blobs (digest, path, size, stored_size, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (digest, path, len(body), len(data), ts, ts)
+                    )
+            self._index(conn, digest, status_code, ts)
+            if known is None:
+                self._enforce_retention(conn)
+        return known is None
+
+    def record_unchanged(self, digest, status_code=304, ts=None):
+        """Index a fetch that returned no body (304) against the blob it confirmed"""
+        if not digest:
+            return False
+        conn = self._connect()
+        with self._lock:
+            if conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone() is None:
+                return False
+            self._index(conn, digest, status_code, time.time() if ts is None else ts)
+        return True
+
+    def _index(self, conn, digest, status_code, ts):
+        with conn:
+            conn.execute("INSERT INTO fetches (ts, digest, status_code) VALUES (?, ?, ?)", (ts, digest, status_code))
+            conn.execute("UPDATE blobs SET last_seen = MAX(last_seen, ?) WHERE digest = ?", (ts, digest))
+
+    def _write(self, path, data):
+        # Same temp file + fsync + rename as the state store, so a blob is never half-written
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.blob.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _enforce_retention(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Oldest-fetched blobs go first; the newest blob is always kept
+        rows = conn.execute("SELECT digest, path, stored_size FROM blobs ORDER BY last_seen").fetchall()
+        for digest, path, stored_size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            with conn:
+                conn.execute("DELETE FROM fetches WHERE digest = ?", (digest,))
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= stored_size
+            logger.info(f"Archive over {self.max_bytes} bytes; evicted blob {digest[:12]}")
+
+    def get(self, digest):
+        """Return the decompressed body for ``digest``, or None if it is not archived"""
+        row = self._connect().execute("SELECT path FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        with open(row[0], 'rb') as f:
+            return decompress(row[0], f.read())
+
+    def at(self, ts):
+        """Return (fetch ts, digest) for the latest archived fetch at or before ``ts``"""
+        return self._connect().execute(
+            "SELECT ts, digest FROM fetches WHERE ts <= ? ORDER BY ts DESC LIMIT 1", (ts,)
+        ).fetchone()
+
+    def iter_fetches(self, start=None, end=None):
+        """Yield (ts, digest, status_code) index rows in time order"""
+        cursor = self._connect().execute(
+            "SELECT ts, digest, status_code FROM fetches WHERE ts >= ? AND ts <= ? ORDER BY ts",
+            (0 if start is None else start, time.time() if end is None else end)
+        )
+        for row in cursor:
+            yield row
+
+    def stats(self):
+        conn = self._connect()
+        blobs, size, stored_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+        ).fetchone()
+        fetches = conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0]
+        return {
+            "directory": self.directory,
+            "codec": 'zstd' if zstandard is not None else 'gzip',
+            "blobs": blobs,
+            "fetches": fetches,
+            "raw_bytes": size,
+            "stored_bytes": stored_size,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,165 @@
+"""
+Single-flight refresh jobs.
+
+Every refresh request (manual or scheduled) goes through RefreshJobs.submit().
+While a scrape is running, further requests attach to it instead of starting
+their own, so upstream load stays at one scrape at a time however many people
+press Refresh.
+
+With a store (the leader election database in app.py), each job's status is
+also recorded there, so a job started by one gunicorn worker can be polled
+through any other.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshJob:
+    """One scrape, shared by every request that arrived while it was running"""
+
+    def __init__(self, trigger):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.status = 'running'
+        self.success = None
+        self.error = None
+        self.attached = 1
+        self.started_at = datetime.now().isoformat()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or the timeout passes; returns whether it finished"""
+        return self._done.wait(timeout)
+
+    def finish(self, success, error=None):
+        self.success = success
+        self.error = error
+        self.status = 'succeeded' if success else 'failed'
+        self.finished_at = datetime.now().isoformat()
+        self._done.set()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "trigger": self.trigger,
+            "attached": self.attached,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+
+class StoredRefreshJob:
+    """A job another worker runs, read back from the store; offers the same interface as RefreshJob"""
+
+    def __init__(self, record, store, poll=0.5):
+        self.record = record
+        self.store = store
+        self.poll = poll
+
+    @property
+    def done(self):
+        return self.record["status"] != 'running'
+
+    @property
+    def success(self):
+        return self.record["status"] == 'succeeded'
+
+    @property
+    def error(self):
+        return self.record.get("error")
+
+    def wait(self, timeout=None):
+        """Poll the store until the job finishes or the timeout passes; returns whether it finished"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll)
+            self.record = self.store.load_job(self.record["id"]) or self.record
+        return True
+
+    def to_dict(self):
+        return dict(self.record)
+
+
+class RefreshJobs:
+    """
+    Runs a refresh function as coalesced background jobs and keeps recent results for polling.
+
+    refresh_func is called with the trigger of the job that started the scrape.
+    store, if given, needs save_job(record) and load_job(job_id).
+    """
+
+    def __init__(self, refresh_func, history_size=50, store=None):
+        self.refresh_func = refresh_func
+        self.history_size = history_size
+        self.store = store
+        self._jobs = OrderedDict()
+        self._current = None
+        self._lock = threading.Lock()
+
+    def submit(self, trigger='manual'):
+        """Return the running job, or start a new one if nothing is in flight"""
+        with self._lock:
+            if self._current is not None and not self._current.done:
+                self._current.attached += 1
+                job = self._current
+                started = False
+            else:
+                job = RefreshJob(trigger)
+                self._current = job
+                self._jobs[job.id] = job
+                while len(self._jobs) > self.history_size:
+                    self._jobs.popitem(last=False)
+                started = True
+
+        self._save(job)
+        if not started:
+            return job, False
+        thread = threading.Thread(target=self._run, args=(job,), name=f'refresh-{job.id[:8]}', daemon=True)
+        thread.start()
+        return job, True
+
+    def _run(self, job):
+        try:
+            success = bool(self.refresh_func(job.trigger))
+            job.finish(success)
+        except Exception as e:
+            job.finish(False, str(e))
+        self._save(job)
+
+    def _save(self, job):
+        if self.store is None:
+            return
+        try:
+            self.store.save_job(job.to_dict())
+        except Exception as e:
+            logger.error(f"Failed to record refresh job {job.id}: {e}")
+
+    def get(self, job_id):
+        """A job from this process, else one another worker recorded in the store, else None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self.store is None:
+            return job
+        record = self.store.load_job(job_id)
+        return StoredRefreshJob(record, self.store) if record else None
+
+    @property
+    def current(self):
+        with self._lock:
+            return self._current
@@ -0,0 +1,138 @@
+"""
+One token bucket for every request sent to the SIH site, shared across processes.
+
+The scheduler, manual refreshes, the /api/debug probe, the sih_monitor.py
+daemon and the one-shot CI run all take a token per request from the same
+bucket, a row in a SQLite database. The bucket refills at
+``requests_per_hour`` up to ``burst`` tokens, which bounds the combined
+request rate however many callers there are.
+
+Taking a token is a reservation: when the bucket is empty the caller is
+told how long to wait for its token, and the token is already its own.
+A caller that is not willing to wait that long (max_wait, 0 to fail fast)
+gets RequestBudgetExceeded and takes nothing.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+GRANTED = Counter('sih_governor_granted_total', "Upstream requests allowed by the request governor")
+DENIED = Counter('sih_governor_denied_total', "Upstream requests refused because the shared budget was used up")
+WAIT_SECONDS = Histogram('sih_governor_wait_seconds', "Time a granted request had to wait for its token",
+                         buckets=(0, 1, 5, 15, 30, 60, 120, 300, 600))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class RequestBudgetExceeded(Exception):
+    """Raised instead of sending a request when no token frees up within the caller's max_wait"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Upstream request budget used up; next request allowed in {retry_after:.0f} s")
+
+
+class RequestGovernor:
+    """Token bucket over SQLite: ``requests_per_hour`` refill, at most ``burst`` requests at once"""
+
+    def __init__(self, path='monitor_governor.db', name='upstream', requests_per_hour=20, burst=5, max_wait=120):
+        self.path = path
+        self.name = name
+        self.rate = requests_per_hour / 3600
+        self.burst = max(burst, 1)
+        self.max_wait = max_wait
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT OR IGNORE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (self.name, float(self.burst), time.time())
+        )
+
+    @classmethod
+    def from_config(cls, path, config):
+        """Build from the "governor" config section (see CONFIG_README.md)"""
+        config = config or {}
+        return cls(
+            path,
+            requests_per_hour=config.get('requests_per_hour', 20),
+            burst=config.get('burst', 5),
+            max_wait=config.get('max_wait_seconds', 120)
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit, so the refill-and-take can hold the write lock with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _refilled(self, tokens, updated_at, now):
+        return min(self.burst, tokens + max(now - updated_at, 0) * self.rate)
+
+    def reserve(self, max_wait=None):
+        """
+        Take a token; returns how many seconds to wait before sending the request.
+
+        Raises RequestBudgetExceeded (taking nothing) if that would be longer than
+        ``max_wait`` (default: the configured max_wait; 0 fails fast).
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated_at = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens = self._refilled(tokens, updated_at, now)
+            # Tokens go negative while reservations queue up for future refills
+            wait = max(1 - tokens, 0) / self.rate if self.rate else (0 if tokens >= 1 else float('inf'))
+            if wait > max_wait:
+                conn.execute("COMMIT")
+                DENIED.inc()
+                raise RequestBudgetExceeded(wait)
+            conn.execute(
+                "UPDATE buckets SET tokens = ?, updated_at = ? WHERE name = ?", (tokens - 1, now, self.name)
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        GRANTED.inc()
+        WAIT_SECONDS.observe(wait)
+        if wait:
+            logger.info(f"Request governor: waiting {wait:.1f} s for the shared request budget")
+        return wait
+
+    def acquire(self, max_wait=None):
+        """Blocking form of reserve(): sleeps for the reserved slot"""
+        wait = self.reserve(max_wait)
+        if wait:
+            time.sleep(wait)
+
+    def status(self):
+        tokens, updated_at = self._connect().execute(
+            "SELECT tokens, updated_at FROM buckets WHERE name = ?", (self.name,)
+        ).fetchone()
+        return {
+            "tokens": round(self._refilled(tokens, updated_at, time.time()), 2),
+            "burst": self.burst,
+            "requests_per_hour": round(self.rate * 3600, 2),
+            "max_wait_seconds": self.max_wait
+        }
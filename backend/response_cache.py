@@ -0,0 +1,107 @@
+"""
+Pre-serialized JSON bodies for the read-mostly API endpoints.
+
+Each endpoint's body is built once, kept as bytes alongside a gzipped copy and
+a strong ETag, and only rebuilt after app.py invalidates it (the state or the
+config changed). Repeat polls with a matching If-None-Match get a bodiless
+304, so dashboards and uptime checkers cost neither a serialization nor the
+bandwidth of the body.
+"""
+
+import gzip
+import hashlib
+import threading
+
+from flask import Response
+
+# Bodies smaller than this are sent as-is; gzip would not save anything
+MIN_GZIP_BYTES = 256
+
+
+class CachedBody:
+    """One serialized representation: raw and gzipped bytes with their ETags"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.gzipped = None
+        if len(body) >= MIN_GZIP_BYTES:
+            gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(gzipped) < len(body):
+                self.gzipped = gzipped
+        # Different encodings are different representations, so they need distinct strong ETags
+        self.gzip_etag = f"{self.etag}-gz"
+
+
+class ResponseCache:
+    """Named endpoint bodies, each rebuilt lazily by its builder after invalidate()"""
+
+    def __init__(self, dumps):
+        self.dumps = dumps
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+        self._builders = {}
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, builder):
+        """Serve ``builder()`` (a JSON-serializable value) under ``name``"""
+        with self._lock:
+            self._builders[name] = builder
+            self._generations[name] = 0
+
+    def invalidate(self, *names):
+        """Mark the named bodies (all of them by default) stale; call after the data has changed"""
+        with self._lock:
+            for name in names or list(self._builders):
+                self._generations[name] += 1
+
+    def get(self, name):
+        """Return the current CachedBody for ``name``, rebuilding it if it was invalidated"""
+        with self._lock:
+            generation = self._generations[name]
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == generation:
+                self.hits += 1
+                return entry[1]
+
+        # Built outside the lock; an invalidate() during the build bumps the
+        # generation again, so a stale body is never kept as current
+        body = CachedBody(self.dumps(self._builders[name]()).encode('utf-8'))
+        with self._lock:
+            self.builds += 1
+            current = self._entries.get(name)
+            if current is None or current[0] < generation:
+                self._entries[name] = (generation, body)
+        return body
+
+    def respond(self, name, request):
+        """Build the response for ``name``: 304 on a matching If-None-Match, gzip when accepted"""
+        cached = self.get(name)
+        use_gzip = cached.gzipped is not None and request.accept_encodings['gzip'] > 0
+        etag = cached.gzip_etag if use_gzip else cached.etag
+
+        if request.if_none_match.contains_weak(etag):
+            with self._lock:
+                self.not_modified += 1
+            response = Response(status=304)
+        else:
+            response = Response(cached.gzipped if use_gzip else cached.body, mimetype='application/json')
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "builds": self.builds,
+                "hits": self.hits,
+                "not_modified": self.not_modified,
+                "cached": sorted(self._entries)
+            }
@@ -1,14 +1,47 @@
+import os
 import requests
 from bs4 import BeautifulSoup
 import time
 import json
-import smtplib
+import hashlib
+import asyncio
+import sqlite3
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-import schedule
 import logging
-from config_loader import load_config, load_problem_config
+import atexit
+from config_loader import load_config, load_problem_config, parse_problem_ids
+from submission_parser import CHUNK_SIZE, StreamedPage, find_submission_counts, read_until_found
+from http_session import session_manager
+from async_fetch import fetch_loop
+from history_store import HistoryStore
+from state_store import SharedStateStore, atomic_write
+from notifications import NotificationDispatcher, SMTPConnection
+from digest import DigestBuffer
+from page_archive import PageArchive
+from circuit_breaker import CircuitBreaker, CircuitOpen
+from request_governor import RequestGovernor, RequestBudgetExceeded
+from adaptive_schedule import AdaptivePolicy
+from metrics import Counter, Histogram
+from tracing import tracer, traced, current_span
+
+FETCH_SECONDS = Histogram('sih_fetch_duration_seconds', "Duration of each upstream GET attempt")
+FETCH_RESPONSES = Counter('sih_fetch_responses_total', "Upstream responses by HTTP status ('error' when none arrived)",
+                          ('status',))
+FETCH_BYTES = Histogram('sih_fetch_response_bytes', "Size of upstream response bodies",
+                        buckets=(16384, 65536, 262144, 524288, 1048576, 2097152, 4194304, 8388608))
+FETCH_RETRIES = Counter('sih_fetch_retries_total', "Upstream fetch attempts after the first")
+FETCH_EARLY_STOPS = Counter('sih_fetch_early_stops_total', "Downloads closed once every watched row had arrived")
+FETCH_FORBIDDEN = Counter('sih_fetch_forbidden_total', "Upstream 403 Forbidden responses")
+PARSE_SECONDS = Histogram('sih_parse_duration_seconds', "Time to extract the watched counts from a page")
+PARSE_ROWS = Counter('sih_parse_rows_scanned_total', "Table rows read by the streaming scanner")
+PARSE_FRAGMENTS = Counter('sih_parse_fragment_hits_total', "Watched IDs read from their own row fragment, without a page scan")
+PARSE_FALLBACKS = Counter('sih_parse_fallback_total', "Parses that needed the full-page regex fallback")
+NOTIFICATIONS_QUEUED = Counter('sih_notifications_queued_total', "Notifications handed to the dispatcher",
+                               ('channel',))
+NOTIFICATION_SEND_SECONDS = Histogram('sih_notification_send_duration_seconds',
+                                      "Time to deliver one notification", ('channel',))
 
 class SIHSubmissionMonitor:
     def __init__(self, config_file='config.json', problem_config_file='problem_config.json'):
@@ -19,9 +52,25 @@ class SIHSubmissionMonitor:
         self.config = load_config()
         self.problem_config = load_problem_config()
         self.url = "https://sih.gov.in/sih2025PS"
-        self.target_id = self.problem_config.get('problem_statement_id', '25057')
+        self.target_ids = parse_problem_ids(self.problem_config.get('problem_statement_id', '25057'))
+        self.target_id = self.target_ids[0]
         self.last_count = None
+        self.last_counts = {}
+        self.validators_file = 'fetch_validators.json'
+        self.validators = {}
+        self.pending_validators = None
+        self.request_jitter = (2, 5)
+        self.retry_delay = (10, 30)
         self.setup_logging()
+        self.load_validators()
+        self.history = HistoryStore()
+        # Shared with every app.py worker and the other monitor entry points
+        self.state_store = SharedStateStore(os.environ.get('STATE_DB', 'monitor_state.db'), 'monitor_state.json')
+        self.setup_notifications()
+        self.setup_archive()
+        self.setup_circuit_breaker()
+        # Stop downloading once every watched row has arrived (see early_stop_ids)
+        self.early_stop = (self.config.get('fetch') or {}).get('early_stop', True)
         
     def load_config(self, config_file):
         """Load configuration from JSON file"""
@@ -83,10 +132,78 @@ class SIHSubmissionMonitor:
         )
         self.logger = logging.getLogger(__name__)
     
+    def setup_notifications(self):
+        """Create the background dispatcher and the reusable connections it delivers through"""
+        email_config = self.config.get('email', {})
+        self.smtp = SMTPConnection(
+            email_config.get('smtp_server'),
+            email_config.get('smtp_port'),
+            username=email_config.get('sender_email'),
+            password=email_config.get('sender_password'),
+            starttls=email_config.get('starttls', True),
+            idle_timeout=email_config.get('idle_timeout', 60)
+        )
+        self.twilio_client = None
+        self.notifier = NotificationDispatcher(
+            {'email': self.deliver_email, 'whatsapp': self.deliver_whatsapp},
+            on_idle=self.smtp.close_if_idle
+        )
+        
+        # Channels with digest mode collect changes and send them as one message
+        self.digests = {}
+        for channel in ('email', 'whatsapp'):
+            digest_config = self.config.get(channel, {}).get('digest') or {}
+            if digest_config.get('enabled'):
+                self.digests[channel] = DigestBuffer(
+                    lambda changes, channel=channel: self.send_digest_notification(channel, changes),
+                    window_seconds=digest_config.get('window_minutes', 15) * 60,
+                    max_events=digest_config.get('max_events', 20)
+                )
+        # Send anything still collected when the process stops (e.g. one-shot runs)
+        for digest in self.digests.values():
+            atexit.register(digest.flush)
+    
+    def setup_archive(self):
+        """Open the raw page archive if it is enabled in the config"""
+        archive_config = self.config.get('archive') or {}
+        self.archive = None
+        if archive_config.get('enabled'):
+            self.archive = PageArchive(
+                archive_config.get('directory', 'page_archive'),
+                max_bytes=archive_config.get('max_mb', 200) * 1024 * 1024
+            )
+    
+    def setup_circuit_breaker(self):
+        """Open the breaker, shared with every other monitor process, that stops fetching during a 403 block"""
+        self.breaker = CircuitBreaker.from_config(
+            os.environ.get('CIRCUIT_DB', 'monitor_circuit.db'),
+            self.config.get('circuit_breaker')
+        )
+        # Every request to self.url, from any process, takes a token from this bucket first
+        self.governor = RequestGovernor.from_config(
+            os.environ.get('GOVERNOR_DB', 'monitor_governor.db'),
+            self.config.get('governor')
+        )
+    
+    def archive_page(self, body, digest, status_code):
+        """Archive a fetched body (or, with body None, index an unchanged fetch); never fails the fetch"""
+        if self.archive is None:
+            return
+        try:
+            with tracer.span('archive', changed=body is not None):
+                if body is None:
+                    self.archive.record_unchanged(digest, status_code)
+                else:
+                    self.archive.store(body, digest, status_code)
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"Could not archive fetched page: {e}")
+    
     def get_session_with_headers(self):
-        """Create a session with proper headers to avoid blocking"""
-        import os
-        session = requests.Session()
+        """Return the process-wide pooled session, configured with headers that avoid blocking"""
+        return session_manager.get_session(self.configure_session)
+    
+    def configure_session(self, session):
+        """Set proxy and browser-like headers on a newly created session"""
         
         # Add proxy support if environment variable is set
         proxy_url = os.environ.get('HTTP_PROXY') or os.environ.get('HTTPS_PROXY')
@@ -113,116 +230,263 @@ class SIHSubmissionMonitor:
             'Referer': 'https://www.google.com/',
         }
         session.headers.update(headers)
-        return session
     
-    def fetch_page_content(self):
-        """Fetch the SIH page content with retry logic"""
+    def early_stop_ids(self):
+        """The IDs a fetch may stop reading after, or None when the whole page is wanted (e.g. for the archive)"""
+        if not self.early_stop or self.archive is not None:
+            return None
+        return self.target_ids
+    
+    def fetch_page_content(self, conditional=False, timeout=None, budget_wait=None, stop_after=None):
+        """
+        Fetch the SIH page content with retry logic.
+        
+        With conditional=True the stored ETag / Last-Modified validators are sent and
+        None is returned when the page is unchanged (304 or identical body digest).
+        New validators are only kept once the caller confirms with save_validators().
+        
+        Synchronous wrapper around fetch_page_content_async; with a timeout the fetch
+        is cancelled and TimeoutError raised if it has not finished in time. Raises
+        CircuitOpen without fetching while the site is blocking us (see circuit_breaker.py).
+        
+        Each request waits for the shared request budget (request_governor.py) for up to
+        budget_wait seconds (default: the configured max_wait; 0 fails fast) and raises
+        RequestBudgetExceeded if none is left by then.
+        
+        With stop_after (a list of IDs) the body is streamed through the row scanner and
+        the connection closed once all of them have been seen. The page itself is then
+        not kept: a StreamedPage with the counts read on the way is returned instead,
+        which parse_submission_counts accepts. If some ID never shows up the whole page
+        text is returned as usual.
+        """
+        with tracer.span('fetch', conditional=conditional, early_stop=stop_after is not None) as span:
+            html_content = fetch_loop.run(
+                self.fetch_page_content_async(conditional, budget_wait, stop_after), timeout
+            )
+            span.set(changed=html_content is not None)
+            return html_content
+    
+    async def fetch_page_content_async(self, conditional=False, budget_wait=None, stop_after=None):
+        """Fetch the SIH page content, awaiting jitter and backoff instead of sleeping"""
         import random
+        # Raises CircuitOpen while blocked; the half-open probe is a single attempt
+        probe = self.breaker.before_request()
         session = self.get_session_with_headers()
-        max_retries = 5
+        max_retries = 1 if probe else 5
         
-        for attempt in range(max_retries):
-            try:
-                self.logger.info(f"Fetching page content (attempt {attempt + 1})")
+        conditional_headers = {}
+        if conditional:
+            if self.validators.get('etag'):
+                conditional_headers['If-None-Match'] = self.validators['etag']
+            if self.validators.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = self.validators['last_modified']
+        
+        probe_sent = False
+        try:
+            for attempt in range(max_retries):
+                try:
+                    self.logger.info(f"Fetching page content (attempt {attempt + 1})")
                 
-                # Add random delay to avoid rate limiting
-                if attempt > 0:
-                    delay = random.uniform(10, 30) + (attempt * 5)
-                    self.logger.info(f"Waiting {delay:.1f} seconds before retry...")
-                    time.sleep(delay)
+                    # Add random delay to avoid rate limiting
+                    if attempt > 0:
+                        FETCH_RETRIES.inc()
+                        delay = random.uniform(*self.retry_delay) + (attempt * 5)
+                        self.logger.info(f"Waiting {delay:.1f} seconds before retry...")
+                        with tracer.span('backoff', attempt=attempt + 1, kind='retry', seconds=round(delay, 2)):
+                            await asyncio.sleep(delay)
                 
-                # Add a small random delay even on first attempt
-                time.sleep(random.uniform(2, 5))
+                    # Add a small random delay even on first attempt
+                    jitter = random.uniform(*self.request_jitter)
+                    with tracer.span('backoff', attempt=attempt + 1, kind='jitter', seconds=round(jitter, 2)):
+                        await asyncio.sleep(jitter)
                 
-                response = session.get(self.url, timeout=45, allow_redirects=True)
+                    # Take this request's token from the shared budget (raises if it would wait too long)
+                    budget_delay = await asyncio.to_thread(self.governor.reserve, budget_wait)
+                    if budget_delay:
+                        with tracer.span('backoff', attempt=attempt + 1, kind='governor', seconds=round(budget_delay, 2)):
+                            await asyncio.sleep(budget_delay)
                 
-                # Check for specific error responses
-                if response.status_code == 403:
-                    self.logger.warning(f"403 Forbidden - Server is blocking requests")
-                    if attempt < max_retries - 1:
-                        continue
+                    # The blocking request runs on a worker thread so the loop stays free
+                    request_started = time.perf_counter()
+                    streamed = None
+                    with tracer.span('download', attempt=attempt + 1) as span:
+                        try:
+                            probe_sent = True
+                            response = await asyncio.to_thread(
+                                session.get, self.url, timeout=45, allow_redirects=True, headers=conditional_headers,
+                                stream=stop_after is not None
+                            )
+                            if stop_after is not None and response.status_code == 200:
+                                streamed = await asyncio.to_thread(self.read_streamed_page, response, stop_after)
+                        except requests.RequestException:
+                            FETCH_RESPONSES.inc(status='error')
+                            raise
+                        finally:
+                            FETCH_SECONDS.observe(time.perf_counter() - request_started)
+                        FETCH_RESPONSES.inc(status=response.status_code)
+                        if streamed is not None:
+                            span.set(status_code=response.status_code, bytes=streamed.size, complete=streamed.complete)
+                        else:
+                            span.set(status_code=response.status_code, bytes=len(response.content))
+                
+                    # Check for specific error responses
+                    if response.status_code == 403:
+                        FETCH_FORBIDDEN.inc()
+                        self.logger.warning(f"403 Forbidden - Server is blocking requests")
+                        # Stop retrying as soon as the breaker opens
+                        breaker_state = self.breaker.record_failure()
+                        if attempt < max_retries - 1 and breaker_state == 'closed':
+                            continue
+                        else:
+                            raise requests.exceptions.HTTPError(f"403 Forbidden after {attempt + 1} attempts")
+                
+                    if response.status_code == 304:
+                        self.breaker.record_success()
+                        self.logger.info("304 Not Modified - page unchanged since last check")
+                        await asyncio.to_thread(self.archive_page, None, self.validators.get('digest'), 304)
+                        return None
+                
+                    response.raise_for_status()
+                    self.breaker.record_success()
+                    if streamed is not None:
+                        # Never archived: early stop is off while the archive is enabled
+                        FETCH_BYTES.observe(streamed.size)
+                        digest = streamed.digest
+                        html_content = streamed if streamed.text is None else streamed.text
                     else:
-                        raise requests.exceptions.HTTPError(f"403 Forbidden after {max_retries} attempts")
+                        FETCH_BYTES.observe(len(response.content))
+                        digest, html_content = hashlib.sha256(response.content).hexdigest(), response.text
+                        # Only a new body is compressed and written; a repeat costs one index row
+                        await asyncio.to_thread(self.archive_page, response.content, digest, response.status_code)
+                    if conditional and digest == self.validators.get('digest'):
+                        self.logger.info("Page body unchanged since last check (same digest)")
+                        return None
                 
-                response.raise_for_status()
-                return response.text
-            
-            except requests.RequestException as e:
-                self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    continue
-                else:
-                    # On final failure, try to provide more context
-                    if "403" in str(e):
-                        self.logger.error("Server is consistently blocking requests. This might be due to:")
-                        self.logger.error("1. Rate limiting or anti-bot measures")
-                        self.logger.error("2. IP-based blocking")
-                        self.logger.error("3. Changes in website security")
-                    raise
+                    self.pending_validators = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'digest': digest,
+                        'fetched_at': datetime.now().isoformat()
+                    }
+                    return html_content
+            
+                except requests.RequestException as e:
+                    self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
+                    if attempt < max_retries - 1 and self.breaker.state == 'closed':
+                        continue
+                    else:
+                        # On final failure, try to provide more context
+                        if "403" in str(e):
+                            self.logger.error("Server is consistently blocking requests. This might be due to:")
+                            self.logger.error("1. Rate limiting or anti-bot measures")
+                            self.logger.error("2. IP-based blocking")
+                            self.logger.error("3. Changes in website security")
+                        raise
+        except BaseException:
+            if probe and not probe_sent:
+                # Nothing went out (no budget, cancelled): let the next caller probe instead of
+                # leaving the breaker half-open until the probe timeout
+                self.breaker.release_probe()
+            raise
     
-    def parse_submission_count(self, html_content):
-        """Parse HTML to extract submission count for target problem ID"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def read_streamed_page(self, response, target_ids):
+        """Read a stream=True response until every target row has arrived, then hang up"""
+        try:
+            page = read_until_found(response.iter_content(CHUNK_SIZE), response.encoding, target_ids)
+        finally:
+            # Closing mid-body drops the connection instead of returning it to the pool
+            response.close()
+        if not page.complete:
+            FETCH_EARLY_STOPS.inc()
+            self.logger.info(f"Stopped reading after {page.size} bytes; every watched row has arrived")
+        return page
+    
+    @traced('parse')
+    def parse_submission_counts(self, html_content, target_ids=None):
+        """
+        Parse HTML once and return a problem ID -> submission count map for the watched IDs.
         
-        # Find all table rows
-        rows = soup.find_all('tr')
+        Also takes the StreamedPage an early-stopped fetch returns, whose rows were
+        already scanned while downloading.
+        """
+        target_ids = target_ids or self.target_ids
+        parse_started = time.perf_counter()
         
-        for row in rows:
-            cells = row.find_all('td')
-            
-            if len(cells) >= 15:  # Based on debug output, we need at least 15 columns
-                try:
-                    # Method 1: Check SIH code column (position 14, 0-indexed)
-                    sih_code_cell = cells[14] if len(cells) > 14 else None
-                    if sih_code_cell and f"SIH{self.target_id}" in sih_code_cell.get_text().strip():
-                        # Submission count is in position 15 (0-indexed)
-                        submission_count = cells[15].get_text().strip()
-                        self.logger.info(f"Found via SIH code: {submission_count}")
-                        return int(submission_count)
-                    
-                    # Method 2: Check problem ID column (position 3, 0-indexed)
-                    problem_id_cell = cells[3] if len(cells) > 3 else None
-                    if problem_id_cell and self.target_id in problem_id_cell.get_text().strip():
-                        # Submission count is in position 15 (0-indexed)
-                        submission_count = cells[15].get_text().strip()
-                        self.logger.info(f"Found via Problem ID: {submission_count}")
-                        return int(submission_count)
-                        
-                except (ValueError, IndexError) as e:
-                    continue
+        if isinstance(html_content, StreamedPage):
+            scanner, size = html_content.scanner, html_content.size
+            scanner.pending = [target_id for target_id in target_ids if target_id not in scanner.counts]
+            html_content = None
+        else:
+            # Read each ID from the row around its SIH code; stream through the page only for the rest
+            scanner, size = find_submission_counts(html_content, target_ids), len(html_content)
+        PARSE_ROWS.inc(scanner.rows_scanned)
+        PARSE_FRAGMENTS.inc(len(scanner.fragment_ids))
+        current_span().set(bytes=size, rows_scanned=scanner.rows_scanned,
+                           fragments=len(scanner.fragment_ids), fallback=bool(scanner.pending))
+        
+        counts = {}
+        for target_id, count in scanner.counts.items():
+            if scanner.methods[target_id] == 'sih_code':
+                self.logger.info(f"Found SIH{target_id} via SIH code: {count}")
+            else:
+                self.logger.info(f"Found {target_id} via Problem ID: {count}")
+            counts[target_id] = count
+        
+        if scanner.pending and html_content is None:
+            # The page was not kept; only happens if the watched IDs changed since the fetch
+            for target_id in scanner.pending:
+                self.logger.warning(f"Could not find problem statement with ID {target_id}")
+        elif scanner.pending:
+            PARSE_FALLBACKS.inc()
+            # Only the rare miss path pays for a full BeautifulSoup tree
+            all_text = BeautifulSoup(html_content, 'html.parser').get_text()
+            
+            for target_id in scanner.pending:
+                count = self.fallback_submission_count(all_text, target_id)
+                if count is not None:
+                    counts[target_id] = count
+                else:
+                    self.logger.warning(f"Could not find problem statement with ID {target_id}")
+        
+        PARSE_SECONDS.observe(time.perf_counter() - parse_started)
+        if not counts:
+            raise ValueError(f"Could not find problem statement with ID {', '.join(target_ids)}")
         
-        # Fallback: Search in all text content
-        all_text = soup.get_text()
-        if f"SIH{self.target_id}" in all_text:
-            self.logger.warning(f"Found SIH{self.target_id} in page but couldn't parse submission count")
+        # Report in the configured order rather than page order
+        return {target_id: counts[target_id] for target_id in target_ids if target_id in counts}
+    
+    def parse_submission_count(self, html_content):
+        """Parse HTML to extract submission count for target problem ID"""
+        return self.parse_submission_counts(html_content, [self.target_id])[self.target_id]
+    
+    def fallback_submission_count(self, all_text, target_id):
+        """Search the page text for an ID whose row could not be parsed"""
+        if f"SIH{target_id}" in all_text:
+            self.logger.warning(f"Found SIH{target_id} in page but couldn't parse submission count")
             self.logger.warning("The page structure might have changed")
             
             # Try to find it manually in the raw text
             import re
-            pattern = f"SIH{self.target_id}.*?(\\d+)"
+            pattern = f"SIH{target_id}.*?(\\d+)"
             match = re.search(pattern, all_text)
             if match:
                 count = int(match.group(1))
                 self.logger.info(f"Found via regex fallback: {count}")
                 return count
         
-        raise ValueError(f"Could not find problem statement with ID {self.target_id}")
+        return None
     
-    def send_email_notification(self, current_count, previous_count):
-        """Send email notification about count change"""
+    def send_email_notification(self, current_count, previous_count, problem_id=None):
+        """Queue an email notification about a count change"""
         if not self.config['email']['enabled']:
             return
-            
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email']['sender_email']
-            msg['To'] = self.config['email']['recipient_email']
-            msg['Subject'] = f"SIH Submission Count Update - Problem ID {self.target_id}"
-            
-            body = f"""
+        
+        problem_id = problem_id or self.target_id
+        
+        body = f"""
             SIH Submission Count Update
             
-            Problem Statement ID: {self.target_id}
+            Problem Statement ID: {problem_id}
             Previous Count: {previous_count if previous_count is not None else 'N/A'}
             Current Count: {current_count}
             Change: {'+' if previous_count is None else ''}{current_count - (previous_count or 0)}
@@ -231,86 +495,181 @@ class SIHSubmissionMonitor:
             
             URL: {self.url}
             """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.config['email']['smtp_server'], self.config['email']['smtp_port'])
-            server.starttls()
-            server.login(self.config['email']['sender_email'], self.config['email']['sender_password'])
-            server.send_message(msg)
-            server.quit()
-            
-            self.logger.info("Email notification sent successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send email notification: {e}")
+        
+        self.notifier.enqueue('email', {
+            'subject': f"SIH Submission Count Update - Problem ID {problem_id}",
+            'body': body
+        })
+        NOTIFICATIONS_QUEUED.inc(channel='email')
     
-    def send_whatsapp_notification(self, current_count, previous_count):
-        """Send WhatsApp notification using Twilio"""
+    def send_whatsapp_notification(self, current_count, previous_count, problem_id=None):
+        """Queue a WhatsApp notification about a count change"""
         if not self.config['whatsapp']['enabled']:
             return
-            
-        try:
-            from twilio.rest import Client
-            
-            client = Client(self.config['whatsapp']['twilio_sid'], self.config['whatsapp']['twilio_token'])
-            
-            message_body = f"""
+        
+        problem_id = problem_id or self.target_id
+        
+        message_body = f"""
 SIH Submission Update
 
-Problem ID: {self.target_id}
+Problem ID: {problem_id}
 Previous: {previous_count or 'N/A'}
 Current: {current_count}
 Change: {'+' if previous_count is None else ''}{current_count - (previous_count or 0)}
 
 Time: {datetime.now().strftime('%H:%M:%S')}
             """
-            
-            message = client.messages.create(
-                body=message_body,
-                from_=self.config['whatsapp']['from_number'],
-                to=self.config['whatsapp']['to_number']
+        
+        self.notifier.enqueue('whatsapp', {'body': message_body})
+        NOTIFICATIONS_QUEUED.inc(channel='whatsapp')
+    
+    @traced('notify')
+    def notify_change(self, problem_id, current_count, previous_count, channels=('email', 'whatsapp')):
+        """Route a count change to each channel, either directly or through its digest"""
+        current_span().set(problem_id=problem_id, channels=list(channels))
+        senders = {
+            'email': self.send_email_notification,
+            'whatsapp': self.send_whatsapp_notification
+        }
+        for channel in channels:
+            try:
+                if channel in self.digests:
+                    if self.config[channel]['enabled']:
+                        self.digests[channel].add(problem_id, previous_count, current_count)
+                else:
+                    senders[channel](current_count, previous_count, problem_id)
+            except Exception as e:
+                self.logger.error(f"{channel} notification error: {e}")
+    
+    def send_digest_notification(self, channel, changes):
+        """Queue one combined message for a batch of count changes"""
+        lines = []
+        for change in changes:
+            before, after = change['before'], change['after']
+            delta = after - (before or 0)
+            lines.append(
+                f"{change['problem_id']}: {before if before is not None else 'N/A'} -> {after} "
+                f"({'+' if delta >= 0 else ''}{delta})"
             )
-            
-            self.logger.info(f"WhatsApp notification sent: {message.sid}")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send WhatsApp notification: {e}")
+        summary = "\n".join(lines)
+        
+        if channel == 'email':
+            body = f"""
+SIH Submission Count Digest
+
+{len(changes)} problem statement(s) changed:
+
+{summary}
+
+Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+URL: {self.url}
+"""
+            self.notifier.enqueue('email', {
+                'subject': f"SIH Submission Digest - {len(changes)} problem(s) changed",
+                'body': body
+            })
+            NOTIFICATIONS_QUEUED.inc(channel='email')
+        else:
+            body = f"""
+SIH Submission Digest
+
+{summary}
+
+Time: {datetime.now().strftime('%H:%M:%S')}
+"""
+            self.notifier.enqueue('whatsapp', {'body': body})
+            NOTIFICATIONS_QUEUED.inc(channel='whatsapp')
+    
+    @traced('deliver', channel='email')
+    def deliver_email(self, payload):
+        """Send a queued email over the reusable SMTP connection (called by the dispatcher)"""
+        msg = MIMEMultipart()
+        msg['From'] = self.config['email']['sender_email']
+        msg['To'] = self.config['email']['recipient_email']
+        msg['Subject'] = payload['subject']
+        msg.attach(MIMEText(payload['body'], 'plain'))
+        
+        send_started = time.perf_counter()
+        self.smtp.send_message(msg)
+        NOTIFICATION_SEND_SECONDS.observe(time.perf_counter() - send_started, channel='email')
+        self.logger.info(f"Email notification sent successfully: {payload['subject']}")
     
+    @traced('deliver', channel='whatsapp')
+    def deliver_whatsapp(self, payload):
+        """Send a queued WhatsApp message using Twilio (called by the dispatcher)"""
+        if self.twilio_client is None:
+            from twilio.rest import Client
+            self.twilio_client = Client(self.config['whatsapp']['twilio_sid'], self.config['whatsapp']['twilio_token'])
+        
+        send_started = time.perf_counter()
+        message = self.twilio_client.messages.create(
+            body=payload['body'],
+            from_=self.config['whatsapp']['from_number'],
+            to=self.config['whatsapp']['to_number']
+        )
+        NOTIFICATION_SEND_SECONDS.observe(time.perf_counter() - send_started, channel='whatsapp')
+        self.logger.info(f"WhatsApp notification sent: {message.sid}")
+    
+    @traced('check', trigger='monitor')
     def check_submissions(self):
         """Main method to check submission count"""
+        fetch_started = time.perf_counter()
         try:
             self.logger.info("Starting submission count check...")
+            self.sync_shared_state()
             
-            # Fetch and parse the page
-            html_content = self.fetch_page_content()
-            current_count = self.parse_submission_count(html_content)
+            # Fetch the page once and parse every watched ID from it
+            html_content = self.fetch_page_content(
+                conditional=self.has_all_counts(self.last_counts), stop_after=self.early_stop_ids()
+            )
+            fetch_latency_ms = (time.perf_counter() - fetch_started) * 1000
             
-            self.logger.info(f"Current submission count for ID {self.target_id}: {current_count}")
+            if html_content is None:
+                # Nothing changed on the page, so there is nothing to parse or notify
+                self.logger.info("Page unchanged - skipping parse and notifications")
+                self.save_state()
+                self.record_history(self.last_counts, fetch_latency_ms, 'unchanged')
+                return
             
-            # Check if count has changed
-            if self.last_count is not None and current_count != self.last_count:
-                self.logger.info(f"Count changed from {self.last_count} to {current_count}")
-                
-                # Send notifications
-                self.send_email_notification(current_count, self.last_count)
-                self.send_whatsapp_notification(current_count, self.last_count)
+            current_counts = self.parse_submission_counts(html_content)
             
-            elif self.last_count is None:
-                self.logger.info("First run - establishing baseline count")
-                self.send_email_notification(current_count, None)
+            for problem_id, current_count in current_counts.items():
+                self.logger.info(f"Current submission count for ID {problem_id}: {current_count}")
+                previous_count = self.last_counts.get(problem_id)
+                
+                # Check if count has changed
+                if previous_count is not None and current_count != previous_count:
+                    self.logger.info(f"Count for ID {problem_id} changed from {previous_count} to {current_count}")
+                    
+                    # Send notifications (directly or via the channel's digest)
+                    self.notify_change(problem_id, current_count, previous_count)
+                
+                elif previous_count is None:
+                    self.logger.info(f"First run for ID {problem_id} - establishing baseline count")
+                    self.notify_change(problem_id, current_count, None, channels=('email',))
             
-            # Update last known count
-            self.last_count = current_count
+            # Update last known counts
+            self.last_counts.update(current_counts)
+            self.last_count = self.last_counts.get(self.target_id)
             
             # Save state
             self.save_state()
+            self.save_validators()
+            self.record_history(current_counts, fetch_latency_ms, 'ok')
+            
+        except (CircuitOpen, RequestBudgetExceeded) as e:
+            # Stopped before getting a response (breaker open or no request budget); the last saved counts stand
+            self.logger.warning(f"Skipping check: {e}")
             
         except Exception as e:
             self.logger.error(f"Error during submission check: {e}")
             
+            blocked = "403" in str(e) or "Forbidden" in str(e)
+            self.record_history({}, (time.perf_counter() - fetch_started) * 1000, 'blocked' if blocked else 'error')
+            
             # If it's a 403 error, provide specific guidance
-            if "403" in str(e) or "Forbidden" in str(e):
+            if blocked:
                 self.logger.error("The website is blocking requests. Possible solutions:")
                 self.logger.error("1. The site may have implemented stronger anti-bot measures")
                 self.logger.error("2. Try accessing from a different IP address")
@@ -324,24 +683,14 @@ Time: {datetime.now().strftime('%H:%M:%S')}
                     self.logger.error(f"Failed to send error notification: {notify_err}")
     
     def send_error_notification(self, error_message):
-        """Send notification about monitoring errors"""
+        """Queue a notification about monitoring errors"""
         if not self.config['email']['enabled']:
             return
-            
-        try:
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            import smtplib
-            
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email']['sender_email']
-            msg['To'] = self.config['email']['recipient_email']
-            msg['Subject'] = f"SIH Monitor Error - Problem ID {self.target_id}"
-            
-            body = f"""
+        
+        body = f"""
             SIH Monitor Error Alert
             
-            Problem Statement ID: {self.target_id}
+            Problem Statement ID: {', '.join(self.target_ids)}
             Error: {error_message}
             Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
@@ -349,56 +698,109 @@ Time: {datetime.now().strftime('%H:%M:%S')}
             
             If this is a 403 Forbidden error, the website may be blocking automated requests.
             """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.config['email']['smtp_server'], self.config['email']['smtp_port'])
-            server.starttls()
-            server.login(self.config['email']['sender_email'], self.config['email']['sender_password'])
-            server.send_message(msg)
-            server.quit()
-            
-            self.logger.info("Error notification sent successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send error notification: {e}")
+        
+        self.notifier.enqueue('email', {
+            'subject': f"SIH Monitor Error - Problem ID {', '.join(self.target_ids)}",
+            'body': body
+        })
+        NOTIFICATIONS_QUEUED.inc(channel='email')
+    
+    def load_validators(self):
+        """Load the conditional-request validators saved by the last successful check"""
+        try:
+            with open(self.validators_file, 'r') as f:
+                self.validators = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.validators = {}
     
+    def save_validators(self):
+        """Keep the validators of the last fetched page once it has been parsed successfully"""
+        if not self.pending_validators:
+            return
+        
+        self.validators = self.pending_validators
+        self.pending_validators = None
+        # The web app and sih_monitor.py share this file: replace it whole, never rewrite it in place
+        try:
+            atomic_write(self.validators_file, json.dumps(self.validators, indent=2))
+        except OSError as e:
+            self.logger.error(f"Failed to save fetch validators to {self.validators_file}: {e}")
+    
+    def has_all_counts(self, counts):
+        """Whether every watched ID already has a count, i.e. an unchanged page can be skipped"""
+        return all(counts.get(target_id) is not None for target_id in self.target_ids)
+    
+    @traced('persist', kind='history')
+    def record_history(self, counts, latency_ms=None, status='ok'):
+        """Append this check to the history store; watched IDs without a count are recorded as missing"""
+        try:
+            found = {target_id: counts[target_id] for target_id in self.target_ids if counts.get(target_id) is not None}
+            missing = {target_id: None for target_id in self.target_ids if target_id not in found}
+            # One timestamp for both halves, so the schedule counts this as a single check
+            ts = time.time()
+            if found:
+                self.history.record(found, latency_ms, status, ts)
+            if missing:
+                self.history.record(missing, latency_ms, 'missing' if status == 'ok' else status, ts)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to record history: {e}")
+    
+    @traced('persist', kind='state')
     def save_state(self):
-        """Save current state to file"""
+        """Save current state to the shared state store"""
+        # Same schema as app.py's current_state; committed to SQLite, mirrored to JSON in the background
         state = {
-            'last_count': self.last_count,
-            'last_check': datetime.now().isoformat(),
-            'target_id': self.target_id,
-            'problem_id': self.target_id  # For frontend compatibility
+            'count': self.last_count,
+            'counts': self.last_counts,
+            'last_refresh': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'problem_id': self.target_id,
+            'problem_ids': self.target_ids
         }
-        with open('monitor_state.json', 'w') as f:
-            json.dump(state, f, indent=2)
+        self.state_store.save(state)
+    
+    def sync_problem_ids(self, state):
+        """Follow a problem ID change another process committed to the shared state; True if the IDs changed"""
+        problem_ids = list(state.get('problem_ids') or [])
+        if not problem_ids or problem_ids == self.target_ids:
+            return False
+        self.logger.info(f"Watched problem IDs changed to {', '.join(problem_ids)} by another process")
+        self.target_ids = problem_ids
+        self.target_id = problem_ids[0]
+        self.problem_config['problem_statement_id'] = problem_ids if len(problem_ids) > 1 else problem_ids[0]
+        return True
+    
+    def sync_shared_state(self):
+        """Adopt the counts and watched IDs if another process (e.g. the web app) committed newer ones"""
+        state = self.state_store.read_if_changed()
+        if not state:
+            return
+        self.sync_problem_ids(state)
+        self.last_counts = dict(state.get('counts') or {})
+        self.last_count = self.last_counts.get(self.target_id)
     
     def load_state(self):
         """Load previous state if exists"""
-        try:
-            with open('monitor_state.json', 'r') as f:
-                state = json.load(f)
-                self.last_count = state.get('last_count')
-                self.logger.info(f"Loaded previous state: last_count = {self.last_count}")
-        except FileNotFoundError:
+        state = self.state_store.load()
+        if not state:
             self.logger.info("No previous state found, starting fresh")
+            return
+        
+        self.last_counts = dict(state.get('counts') or {})
+        self.last_count = self.last_counts.get(self.target_id)
+        self.logger.info(f"Loaded previous state: last_counts = {self.last_counts}")
     
     def run_scheduler(self):
-        """Run the monitoring with 12-hour intervals"""
+        """Run the monitoring, waiting an adaptive interval (see adaptive_schedule.py) between checks"""
         self.logger.info("Starting SIH Submission Monitor")
         self.load_state()
+        policy = AdaptivePolicy.from_config(self.history, self.config.get('schedule'))
         
-        # Schedule the job every 12 hours
-        schedule.every(12).hours.do(self.check_submissions)
-        
-        # Run once immediately
-        self.check_submissions()
-        
-        # Keep the script running
+        # Run once immediately, then as often as the recent change rate warrants
         while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute if it's time to run
+            self.check_submissions()
+            decision = policy.decide()
+            self.logger.info(f"Next check in {decision.delay / 60:.1f} minutes ({decision.reason})")
+            time.sleep(decision.delay)
 
 def main():
     """Main function to run the monitor"""
@@ -407,7 +809,7 @@ def main():
     # For testing, you can run a single check
     # monitor.check_submissions()
     
-    # For continuous monitoring every 12 hours
+    # For continuous monitoring at an adaptive interval
     monitor.run_scheduler()
 
 if __name__ == "__main__":
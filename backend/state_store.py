@@ -0,0 +1,311 @@
+"""
+Persistence of the monitor state shared by app.py and the standalone monitor.
+
+SharedStateStore keeps the current state as one versioned row in a SQLite
+database (WAL mode), which every gunicorn worker, the sih_monitor.py daemon
+and the one-shot sih_monitor_single.py read and write. Readers check SQLite's
+data_version first, so finding out that nothing changed costs one PRAGMA and
+no row read.
+
+SharedDocumentStore keeps other JSON documents that one process produces
+and every worker serves (the problem catalog, the schedule decision) as
+further rows of the same table.
+
+StateStore writes monitor_state.json atomically (temp file + fsync +
+rename), skipping unchanged states, on a write-behind thread so callers never
+do file I/O while holding their state lock. SharedStateStore keeps it as a
+human-readable mirror and imports it when the database is new.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+WRITE_SECONDS = Histogram('sih_state_write_duration_seconds', "Time to write and fsync the state file",
+                          buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+SHARED_WRITE_SECONDS = Histogram('sih_shared_state_write_duration_seconds', "Time to commit the shared state row",
+                                 buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    writer TEXT
+);
+"""
+
+
+def atomic_write(path, text):
+    """Replace ``path`` with ``text`` via a fsynced temp file, so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def normalize_state(state):
+    """
+    Convert any saved state to the shared schema.
+
+    Older files written by SIHSubmissionMonitor.save_state used last_count /
+    last_counts / last_check / target_id(s); app.py used count / last_refresh.
+    """
+    state = dict(state or {})
+    normalized = {
+        "count": state.get("count", state.get("last_count")),
+        "counts": state.get("counts") or state.get("last_counts") or {},
+        "last_refresh": state.get("last_refresh", state.get("last_check")),
+        "problem_id": state.get("problem_id", state.get("target_id")),
+        "problem_ids": state.get("problem_ids") or state.get("target_ids") or []
+    }
+    if not normalized["counts"] and normalized["count"] is not None and normalized["problem_id"]:
+        normalized["counts"] = {normalized["problem_id"]: normalized["count"]}
+
+    for key in ("error", "status", "missing_ids"):
+        if key in state:
+            normalized[key] = state[key]
+    return normalized
+
+
+class StateStore:
+    """Atomic, debounced write-behind persistence of the monitor state"""
+
+    def __init__(self, path='monitor_state.json', debounce=0.5):
+        self.path = path
+        self.debounce = debounce
+        self.writes = 0
+        self.skipped_writes = 0
+        self._pending = None
+        self._last_written = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def load(self):
+        """Load the saved state in the shared schema; a corrupt file is set aside, not ignored"""
+        try:
+            with open(self.path, 'r') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return {}
+
+        try:
+            state = normalize_state(json.loads(raw))
+        except ValueError as e:
+            corrupt_path = f"{self.path}.corrupt"
+            os.replace(self.path, corrupt_path)
+            logger.error(f"State file {self.path} is corrupt ({e}); moved it to {corrupt_path}")
+            return {}
+
+        self._last_written = json.dumps(state, sort_keys=True)
+        return state
+
+    def save(self, state):
+        """Queue a snapshot of ``state`` for writing; returns immediately"""
+        snapshot = normalize_state(state)
+        with self._lock:
+            self._pending = snapshot
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name='state-writer', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def flush(self):
+        """Write any queued snapshot now, after any write already in progress"""
+        self._write_pending()
+
+    def _writer_loop(self):
+        while True:
+            self._wakeup.wait()
+            # Let a burst of updates settle so only the latest one is written
+            if self.debounce:
+                time.sleep(self.debounce)
+            self._wakeup.clear()
+            try:
+                self._write_pending()
+            except OSError as e:
+                logger.error(f"Failed to persist state to {self.path}: {e}")
+
+    def _write_pending(self):
+        # Taking the snapshot under the write lock keeps writes in save() order
+        with self._write_lock:
+            with self._lock:
+                state = self._pending
+                self._pending = None
+            if state is not None:
+                self._write(state)
+
+    def _write(self, state):
+        serialized = json.dumps(state, sort_keys=True)
+        if serialized == self._last_written:
+            self.skipped_writes += 1
+            return
+
+        write_started = time.perf_counter()
+        atomic_write(self.path, serialized)
+        WRITE_SECONDS.observe(time.perf_counter() - write_started)
+        self._last_written = serialized
+        self.writes += 1
+
+
+class SharedStateStore:
+    """
+    The current state as a versioned SQLite row, consistent across processes.
+
+    save() commits synchronously (a single small WAL write) and bumps the
+    version; read_if_changed() returns the state only when another process or
+    thread has committed a newer version since this process last saw one.
+    """
+
+    # Every body is converted to the shared state schema on the way in and out
+    normalize = staticmethod(normalize_state)
+
+    def __init__(self, path='monitor_state.db', mirror_path='monitor_state.json', name='current'):
+        self.path = path
+        self.name = name
+        self.writer = f"{os.getpid()}"
+        self.mirror = StateStore(mirror_path) if mirror_path else None
+        self.writes = 0
+        self.skipped_writes = 0
+        self.reloads = 0
+        self._seen_version = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connect().executescript(SHARED_SCHEMA)
+        self._import_mirror()
+
+    def _connect(self):
+        # Per-thread connections; data_version is tracked per connection
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.data_version = None
+        return conn
+
+    def _import_mirror(self):
+        """Seed a new database from an existing monitor_state.json"""
+        if self.mirror is None:
+            return
+        row = self._connect().execute("SELECT 1 FROM state WHERE name = ?", (self.name,)).fetchone()
+        if row is None:
+            state = self.mirror.load()
+            if state:
+                self.save(state, mirror=False)
+                logger.info(f"Imported {self.mirror.path} into {self.path}")
+
+    def load(self):
+        """The shared state in the shared schema, or {} if nothing has been saved yet"""
+        row = self._connect().execute(
+            "SELECT version, body FROM state WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None:
+            return {}
+        with self._lock:
+            self._seen_version = max(self._seen_version, row[0])
+        return self.normalize(json.loads(row[1]))
+
+    def read_if_changed(self):
+        """
+        Return the state if a version this process has not seen was committed, else None.
+
+        The common no-change case is one PRAGMA data_version on this thread's
+        connection; the row is only read after some connection committed.
+        """
+        conn = self._connect()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._local.data_version:
+            return None
+        self._local.data_version = data_version
+
+        row = conn.execute("SELECT version, body FROM state WHERE name = ?", (self.name,)).fetchone()
+        with self._lock:
+            if row is None or row[0] <= self._seen_version:
+                return None
+            self._seen_version = row[0]
+            self.reloads += 1
+        return self.normalize(json.loads(row[1]))
+
+    def save(self, state, mirror=True):
+        """Commit ``state`` as the new shared version (skipped if unchanged); returns the version"""
+        snapshot = self.normalize(state)
+        body = json.dumps(snapshot, sort_keys=True)
+
+        started = time.perf_counter()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT version, body FROM state WHERE name = ?", (self.name,)).fetchone()
+            if row is not None and row[1] == body:
+                conn.execute("COMMIT")
+                with self._lock:
+                    self.skipped_writes += 1
+                return row[0]
+            version = (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO state (name, version, body, updated_at, writer) VALUES (?, ?, ?, ?, ?)",
+                (self.name, version, body, time.time(), self.writer)
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        SHARED_WRITE_SECONDS.observe(time.perf_counter() - started)
+
+        with self._lock:
+            # Our own write is not news to this process
+            self._seen_version = max(self._seen_version, version)
+            self.writes += 1
+        if mirror and self.mirror is not None:
+            self.mirror.save(snapshot)
+        return version
+
+    def flush(self):
+        """Write the JSON mirror now (the shared row itself is always committed by save())"""
+        if self.mirror is not None:
+            self.mirror.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "version": self._seen_version,
+                "writes": self.writes,
+                "skipped_writes": self.skipped_writes,
+                "reloads": self.reloads
+            }
+
+
+class SharedDocumentStore(SharedStateStore):
+    """A JSON document kept as-is under its own name in the shared state database"""
+
+    normalize = staticmethod(dict)
+
+    def __init__(self, path='monitor_state.db', name='document'):
+        super().__init__(path, mirror_path=None, name=name)
@@ -0,0 +1,310 @@
+"""
+Streaming row scanner for the SIH problem statement page.
+
+Reads the page as a stream of parser events instead of building a full
+BeautifulSoup tree, and stops as soon as every watched row has been seen.
+
+read_until_found() runs the same scanner over a response body as it
+downloads, so the fetch can hang up once every watched row has arrived and
+hand over the counts it read on the way without keeping the page.
+
+find_submission_counts() goes one step further for the usual case: it finds
+each watched ``SIH<id>`` marker with a substring search, cuts out the <tr>
+enclosing it and scans only that fragment. IDs whose fragment does not
+validate are left to the full scan.
+"""
+
+import codecs
+import hashlib
+import tempfile
+from html.parser import HTMLParser
+
+# Cell positions as counted by BeautifulSoup's recursive row.find_all('td'),
+# i.e. including the <td>s of the modal table nested inside the title cell
+PROBLEM_ID_CELL = 3
+SIH_CODE_CELL = 14
+COUNT_CELL = 15
+MIN_CELLS = 15
+
+CHUNK_SIZE = 64 * 1024
+
+# Occurrences of a marker tried before the ID is left to the full scan
+MAX_MARKER_HITS = 3
+
+# Each fragment costs a search from the top of the page; beyond this many IDs one full scan is cheaper
+MAX_FRAGMENT_IDS = 50
+
+
+class _StopScan(Exception):
+    """Raised from a parser callback to abandon the rest of the document"""
+
+
+class RowScanner(HTMLParser):
+    """
+    Event-driven walk over the outer <tr> rows of the page.
+
+    Collects the text of the cells listed in WANTED_CELLS for the current row
+    and calls cell_closed() / row_closed() so subclasses can act on a row
+    without a tree ever being built.
+    """
+
+    WANTED_CELLS = ()
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows_scanned = 0
+        self._row_depth = 0
+        self._cell_index = -1
+        self._open_cells = []
+        self._cells = {}
+
+    @property
+    def done(self):
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            if self._row_depth == 0:
+                self._cell_index = -1
+                self._open_cells = []
+                self._cells = {}
+            self._row_depth += 1
+        elif tag == 'td' and self._row_depth:
+            self._cell_index += 1
+            self._open_cells.append(self._cell_index)
+            if self._cell_index in self.WANTED_CELLS:
+                self._cells[self._cell_index] = []
+
+    def handle_endtag(self, tag):
+        if tag == 'td' and self._open_cells:
+            self.cell_closed(self._open_cells.pop())
+        elif tag == 'tr' and self._row_depth:
+            self._row_depth -= 1
+            if self._row_depth == 0:
+                self.rows_scanned += 1
+                self._open_cells = []
+                self.row_closed()
+
+    def handle_data(self, data):
+        for index in self._open_cells:
+            parts = self._cells.get(index)
+            if parts is not None:
+                parts.append(data)
+
+    def cell_closed(self, index):
+        """Called when a <td> of the current row closes"""
+
+    def row_closed(self):
+        """Called when an outer <tr> closes"""
+
+    def _cell_text(self, index):
+        return ''.join(self._cells.get(index, ())).strip()
+
+    def feed(self, data):
+        if self.done:
+            return
+        try:
+            super().feed(data)
+        except _StopScan:
+            pass
+
+
+class SubmissionRowScanner(RowScanner):
+    """Builds a problem ID -> submission count map in one pass, stopping once every ID is found"""
+
+    WANTED_CELLS = (PROBLEM_ID_CELL, SIH_CODE_CELL, COUNT_CELL)
+
+    def __init__(self, target_ids):
+        super().__init__()
+        self.target_ids = [str(target_id) for target_id in target_ids]
+        self.pending = list(self.target_ids)
+        self.counts = {}
+        self.methods = {}
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def cell_closed(self, index):
+        if index == COUNT_CELL:
+            self._check_row()
+
+    def _check_row(self):
+        """Apply both match strategies once the count cell of a row is complete"""
+        if self._cell_index < MIN_CELLS - 1:
+            return
+
+        sih_code_text = self._cell_text(SIH_CODE_CELL)
+        problem_id_text = self._cell_text(PROBLEM_ID_CELL)
+        count = None
+
+        for target_id in list(self.pending):
+            if f"SIH{target_id}" in sih_code_text:
+                method = 'sih_code'
+            elif target_id in problem_id_text:
+                method = 'problem_id'
+            else:
+                continue
+
+            if count is None:
+                try:
+                    count = int(self._cell_text(COUNT_CELL))
+                except ValueError:
+                    return
+
+            self.counts[target_id] = count
+            self.methods[target_id] = method
+            self.pending.remove(target_id)
+
+        if self.done:
+            self.rows_scanned += 1
+            raise _StopScan()
+
+
+def scan_submission_counts(html_content, target_ids, chunk_size=CHUNK_SIZE):
+    """
+    Scan HTML for every target row and return the finished scanner.
+
+    The document is fed in chunks so scanning stops at the chunk holding the
+    last watched row; ``scanner.pending`` lists the IDs that were not found.
+    """
+    scanner = SubmissionRowScanner(target_ids)
+    for start in range(0, len(html_content), chunk_size):
+        scanner.feed(html_content[start:start + chunk_size])
+        if scanner.done:
+            break
+    return scanner
+
+
+def _ends_tag_name(html_content, index):
+    """True if a '<tr' / '</tr' match ending before ``index`` is the whole tag name (not e.g. '<track')"""
+    return index >= len(html_content) or html_content[index] in '> \t\r\n/'
+
+
+def _row_start(html_content, position):
+    """Offset of the '<tr' of the row enclosing ``position``, skipping complete nested rows; -1 if none"""
+    depth = 0
+    open_at = html_content.rfind('<tr', 0, position)
+    close_at = html_content.rfind('</tr', 0, position)
+    while open_at >= 0:
+        if close_at > open_at:
+            # A nested row closes between here and position: its '<tr' does not count
+            depth += 1
+            close_at = html_content.rfind('</tr', 0, close_at)
+            continue
+        if _ends_tag_name(html_content, open_at + 3):
+            if depth == 0:
+                return open_at
+            depth -= 1
+        open_at = html_content.rfind('<tr', 0, open_at)
+    return -1
+
+
+def _row_end(html_content, position):
+    """Offset just past the '</tr>' closing the row enclosing ``position``; -1 if none"""
+    depth = 0
+    open_at = html_content.find('<tr', position)
+    close_at = html_content.find('</tr', position)
+    while close_at >= 0:
+        if 0 <= open_at < close_at:
+            if _ends_tag_name(html_content, open_at + 3):
+                depth += 1
+            open_at = html_content.find('<tr', open_at + 3)
+            continue
+        if depth == 0:
+            end = html_content.find('>', close_at)
+            return -1 if end < 0 else end + 1
+        depth -= 1
+        close_at = html_content.find('</tr', close_at + 4)
+    return -1
+
+
+def enclosing_rows(html_content, target_id, limit=MAX_MARKER_HITS):
+    """Yield the <tr>...</tr> fragments around the first ``limit`` occurrences of SIH<target_id>"""
+    marker = f"SIH{target_id}"
+    position = html_content.find(marker)
+    while position >= 0 and limit > 0:
+        after = position + len(marker)
+        # SIH2500 must not match inside SIH25001
+        if after >= len(html_content) or not html_content[after].isdigit():
+            limit -= 1
+            start = _row_start(html_content, position)
+            end = _row_end(html_content, after) if start >= 0 else -1
+            if end >= 0:
+                yield html_content[start:end]
+        position = html_content.find(marker, after)
+
+
+def find_submission_counts(html_content, target_ids, chunk_size=CHUNK_SIZE):
+    """
+    Like scan_submission_counts, but each ID is first looked for in its own row fragment.
+
+    A fragment validates when the scanner finds the ID in its SIH code cell
+    with an integer count. Only the IDs left after that are scanned for in the
+    whole document (as are all IDs past the first MAX_FRAGMENT_IDS).
+    ``scanner.fragment_ids`` lists the IDs the fast path resolved.
+    """
+    result = SubmissionRowScanner(target_ids)
+    result.fragment_ids = []
+    for target_id in result.target_ids[:MAX_FRAGMENT_IDS]:
+        for fragment in enclosing_rows(html_content, target_id):
+            scanner = SubmissionRowScanner([target_id])
+            scanner.feed(fragment)
+            result.rows_scanned += scanner.rows_scanned
+            if scanner.methods.get(target_id) == 'sih_code':
+                result.counts[target_id] = scanner.counts[target_id]
+                result.methods[target_id] = 'sih_code'
+                result.pending.remove(target_id)
+                result.fragment_ids.append(target_id)
+                break
+
+    if result.pending:
+        rest = scan_submission_counts(html_content, result.pending, chunk_size)
+        result.rows_scanned += rest.rows_scanned
+        result.counts.update(rest.counts)
+        result.methods.update(rest.methods)
+        result.pending = rest.pending
+    return result
+
+
+class StreamedPage:
+    """
+    What a streamed read produced: the finished scanner, and the page text only
+    when some ID never showed up (``complete``) and the caller needs the whole page
+    """
+
+    def __init__(self, scanner, text, digest, size, complete):
+        self.scanner = scanner
+        self.text = text
+        self.digest = digest
+        self.size = size
+        self.complete = complete
+
+
+def read_until_found(chunks, encoding, target_ids):
+    """
+    Decode and scan byte ``chunks`` as they arrive, stopping once every target row has been seen.
+
+    Only the chunk being scanned is held in memory: the text read so far goes to
+    a temporary file that stays in memory up to CHUNK_SIZE, and is read back only
+    if the stream ends with an ID still missing. When every row arrives the
+    StreamedPage has the scanner's counts and no text. The digest and size cover
+    the bytes read.
+    """
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    scanner = SubmissionRowScanner(target_ids)
+    scanner.fragment_ids = []
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE, mode='w+', encoding='utf-8') as spool:
+        for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            text = decoder.decode(chunk)
+            scanner.feed(text)
+            if scanner.done:
+                return StreamedPage(scanner, None, digest.hexdigest(), size, complete=False)
+            spool.write(text)
+        spool.write(decoder.decode(b'', final=True))
+        spool.seek(0)
+        return StreamedPage(scanner, spool.read(), digest.hexdigest(), size, complete=True)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Trip the circuit breaker against a local 403 stand-in and check the payloads.
+
+Runs entirely offline in a temporary directory: the monitor is pointed at a
+tiny HTTP server that answers every request with 403 Forbidden, so one manual
+refresh opens the breaker. The refresh response and the state event pushed to
+/api/stream subscribers must both report the breaker as open.
+"""
+
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ForbiddenHandler(http.server.BaseHTTPRequestHandler):
+    """Blocks every request, the way the SIH site does when it rate-limits us"""
+
+    def do_GET(self):
+        self.send_response(403)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_forbidden_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ForbiddenHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_app():
+    """Import app.py with throwaway databases and no notification channels"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ.update({
+        'PRODUCTION': '1',
+        'EMAIL_ENABLED': 'false',
+        'WHATSAPP_ENABLED': 'false',
+        'CIRCUIT_FAILURE_THRESHOLD': '1',
+        'FETCH_EARLY_STOP': 'false'
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    import app
+    return app
+
+
+def test_blocked_refresh_payloads(app, server):
+    """A refresh that opens the breaker reports it open, in the response and in the stream"""
+    print("🧪 Testing circuit status in refresh and stream payloads...")
+    app.monitor.url = f"http://127.0.0.1:{server.server_address[1]}/sih2025PS"
+    app.monitor.request_jitter = (0, 0)
+    subscriber, _ = app.event_stream.subscribe()
+
+    response = app.app.test_client().post('/api/refresh?wait=30')
+    data = response.get_json()['data']
+    print(f"   Refresh: status={data.get('status')}, circuit={data['circuit']['state']}")
+
+    events = []
+    while not subscriber.queue.empty():
+        _, event_type, body = subscriber.queue.get_nowait()
+        if event_type == 'state':
+            events.append(json.loads(body))
+    app.event_stream.unsubscribe(subscriber)
+    print(f"   Stream: {[event['circuit']['state'] for event in events]}")
+
+    return (data.get('status') == 'blocked' and data['circuit']['state'] == 'open'
+            and bool(events) and events[-1]['circuit']['state'] == 'open')
+
+
+def main():
+    print("🚀 Circuit Breaker Payload Test")
+    print("=" * 40)
+
+    server = start_forbidden_server()
+    app = load_app()
+    payloads_ok = test_blocked_refresh_payloads(app, server)
+    print()
+
+    print("📊 Test Summary:")
+    print(f"Blocked refresh payloads: {'✅' if payloads_ok else '❌'}")
+    return payloads_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
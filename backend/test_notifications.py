@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Exercise the notification dispatcher against a local SMTP stand-in.
+
+Runs entirely offline: a tiny in-process SMTP server accepts the messages, so
+this shows connection reuse, retries and delivery latency without Gmail.
+"""
+
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from email.mime.text import MIMEText
+from notifications import NotificationDispatcher, SMTPConnection
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply("250 stand-in")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages += 1
+                self.reply("250 OK queued")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL FROM, RCPT TO, RSET, NOOP
+                self.reply("250 OK")
+
+
+def start_stand_in_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInSMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_connection_reuse():
+    """Send a burst of messages and check they share one SMTP connection"""
+    print("🧪 Testing connection reuse...")
+    server = start_stand_in_server()
+    smtp = SMTPConnection('127.0.0.1', server.server_address[1], starttls=False)
+
+    def deliver(payload):
+        msg = MIMEText(payload['body'])
+        msg['Subject'] = payload['subject']
+        msg['From'] = 'monitor@example.com'
+        msg['To'] = 'team@example.com'
+        smtp.send_message(msg)
+
+    outbox_path = os.path.join(tempfile.mkdtemp(), 'outbox.db')
+    dispatcher = NotificationDispatcher({'email': deliver}, outbox_path=outbox_path, workers=1)
+    for i in range(10):
+        dispatcher.enqueue('email', {'subject': f"Test {i}", 'body': f"Message {i}"})
+
+    if not dispatcher.drain(10):
+        print("❌ Messages were not delivered in time")
+        return False
+
+    stats = dispatcher.stats()['channels']['email']
+    print(f"   Delivered: {stats['delivered']}, SMTP connections: {server.connections}")
+    print(f"   Avg delivery latency: {stats['avg_delivery_ms']} ms (max {stats['max_delivery_ms']} ms)")
+    smtp.close()
+    server.shutdown()
+    return server.messages == 10 and server.connections == 1
+
+
+def test_retry():
+    """Fail the first attempt and check the message is retried from the outbox"""
+    print("🧪 Testing retry with backoff...")
+    attempts = []
+
+    def flaky(payload):
+        attempts.append(time.time())
+        if len(attempts) == 1:
+            raise ConnectionError("simulated SMTP outage")
+
+    outbox_path = os.path.join(tempfile.mkdtemp(), 'outbox.db')
+    dispatcher = NotificationDispatcher({'email': flaky}, outbox_path=outbox_path, retry_base_delay=1)
+    dispatcher.enqueue('email', {'subject': 'Retry', 'body': 'Retry me'})
+
+    deadline = time.time() + 10
+    while len(attempts) < 2 and time.time() < deadline:
+        time.sleep(0.1)
+    dispatcher.drain(5)
+
+    stats = dispatcher.stats()
+    print(f"   Attempts: {len(attempts)}, outbox: {stats['outbox']}")
+    return len(attempts) == 2 and not stats['outbox']
+
+
+def main():
+    print("🚀 Notification Dispatcher Test")
+    print("=" * 40)
+
+    reuse_ok = test_connection_reuse()
+    print()
+    
+    retry_ok = test_retry()
+    print()
+
+    print("📊 Test Summary:")
+    print(f"Connection reuse: {'✅' if reuse_ok else '❌'}")
+    print(f"Retry: {'✅' if retry_ok else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
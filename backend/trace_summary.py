@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Summarize a trace file written with SIH_TRACE_FILE: p50 / p95 / max per stage.
+
+    python trace_summary.py traces.jsonl              # every span, rotated files included
+    python trace_summary.py traces.jsonl --slowest 5  # plus the slowest checks, stage by stage
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime
+
+
+def read_spans(path):
+    """Yield spans from ``path`` and its rotated backups (path.1, path.2, ...), oldest first"""
+    backups = sorted(glob.glob(f"{glob.escape(path)}.[0-9]*"), key=lambda name: -int(name.rsplit('.', 1)[1]))
+    for name in backups + ([path] if os.path.exists(path) else []):
+        with open(name, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash or a rotation
+                    continue
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def stage_key(span):
+    """Spans with a kind (backoff:jitter, persist:history, ...) are reported separately"""
+    kind = span.get("attributes", {}).get("kind")
+    return f"{span['name']}:{kind}" if kind else span["name"]
+
+
+def summarize(spans):
+    durations = defaultdict(list)
+    errors = defaultdict(int)
+    for span in spans:
+        key = stage_key(span)
+        durations[key].append(span["duration_ms"])
+        if span.get("status") == "error":
+            errors[key] += 1
+
+    rows = []
+    for key, values in durations.items():
+        values.sort()
+        rows.append({
+            "stage": key,
+            "count": len(values),
+            "errors": errors[key],
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "max_ms": values[-1],
+            "total_ms": sum(values)
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def print_slowest(spans, limit):
+    """Print the slowest root spans with the time of each direct and nested stage"""
+    by_trace = defaultdict(list)
+    for span in spans:
+        by_trace[span["trace_id"]].append(span)
+
+    roots = [span for span in spans if span.get("parent_id") is None and span["name"] == "check"]
+    roots.sort(key=lambda span: span["duration_ms"], reverse=True)
+    for root in roots[:limit]:
+        started = datetime.fromtimestamp(root["start"]).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"\n🐢 check at {started}: {root['duration_ms'] / 1000:.1f} s ({root.get('status')})")
+        children = defaultdict(list)
+        for span in by_trace[root["trace_id"]]:
+            children[span.get("parent_id")].append(span)
+
+        def walk(parent_id, depth):
+            for span in sorted(children[parent_id], key=lambda span: span["start"]):
+                attributes = ', '.join(f"{key}={value}" for key, value in span.get("attributes", {}).items())
+                print(f"   {'  ' * depth}{span['name']:<12}{span['duration_ms'] / 1000:>9.2f} s  {attributes}")
+                walk(span["span_id"], depth + 1)
+
+        walk(root["span_id"], 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize SIH monitor trace spans")
+    parser.add_argument('path', nargs='?', default=os.environ.get('SIH_TRACE_FILE', 'traces.jsonl'))
+    parser.add_argument('--slowest', type=int, default=0, help="also break down the N slowest checks")
+    args = parser.parse_args()
+
+    spans = list(read_spans(args.path))
+    if not spans:
+        print(f"❌ No spans found in {args.path}")
+        return 1
+
+    print(f"📊 Trace summary: {len(spans)} spans from {args.path}")
+    print("=" * 72)
+    print(f"{'stage':<18}{'count':>7}{'errors':>8}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}")
+    for row in summarize(spans):
+        print(f"{row['stage']:<18}{row['count']:>7}{row['errors']:>8}"
+              f"{row['p50_ms']:>11.1f}{row['p95_ms']:>11.1f}{row['max_ms']:>11.1f}")
+
+    if args.slowest:
+        print_slowest(spans, args.slowest)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+"""
+Lightweight tracing of each check as nested spans, written as JSONL.
+
+Enabled by setting SIH_TRACE_FILE (e.g. SIH_TRACE_FILE=traces.jsonl); the
+file rotates at SIH_TRACE_MAX_MB (default 10) keeping SIH_TRACE_BACKUPS old
+files (default 3). Each finished span is one JSON line with its trace ID,
+parent span, stage name, start time, duration and attributes. When tracing is
+off, span() hands back a shared no-op object, so instrumented code costs a
+function call.
+
+The current span lives in a context variable: nested `with tracer.span()`
+blocks and @traced functions become children, and so do spans opened in
+asyncio.to_thread workers or in coroutines run on the fetch loop
+(async_fetch copies the caller's context). Summarize a trace file with
+trace_summary.py.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import time
+import uuid
+
+_current_span = contextvars.ContextVar('sih_current_span', default=None)
+
+
+class Span:
+    """One timed stage; use as a context manager, add attributes with set()"""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start', '_started', '_token')
+
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _current_span.reset(self._token)
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(duration_ms, 3),
+            "status": "ok" if exc_type is None else "error",
+            "attributes": self.attributes
+        }
+        if exc_type is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.emit(record)
+        return False
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and appends finished ones to a rotating JSONL file"""
+
+    def __init__(self, path=None, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self._logger = None
+        if path:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            # A private logger so spans never reach the application log handlers
+            self._logger = logging.getLogger(f'sih.trace.{id(self)}')
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            self._logger.addHandler(handler)
+
+    @property
+    def enabled(self):
+        return self._logger is not None
+
+    def span(self, name, **attributes):
+        """A child of the current span, or the root of a new trace if there is none"""
+        if self._logger is None:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def emit(self, record):
+        self._logger.info(json.dumps(record, default=str))
+
+
+def current_span():
+    """The innermost open span in this context (a no-op span when there is none)"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name, **attributes):
+    """Decorator: run the function inside a span (add attributes with current_span().set())"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def tracer_from_env():
+    return Tracer(
+        os.environ.get('SIH_TRACE_FILE') or None,
+        max_bytes=int(float(os.environ.get('SIH_TRACE_MAX_MB', '10')) * 1024 * 1024),
+        backups=int(os.environ.get('SIH_TRACE_BACKUPS', '3'))
+    )
+
+
+# Shared by every module in this process
+tracer = tracer_from_env()
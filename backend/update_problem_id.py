@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
-Simple script to update the Problem Statement ID for SIH monitoring
-Usage: python update_problem_id.py <new_problem_id>
+Simple script to update the Problem Statement ID(s) for SIH monitoring
+Usage: python update_problem_id.py <new_problem_id>[,<another_id>...]
 """
 
 import sys
@@ -23,7 +23,8 @@ def update_problem_id(new_id, description=None):
         
         # Update the configuration
         old_id = config.get('problem_statement_id', 'None')
-        config['problem_statement_id'] = new_id
+        new_ids = new_id.split(',')
+        config['problem_statement_id'] = new_ids if len(new_ids) > 1 else new_ids[0]
         config['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         if description:
@@ -54,15 +55,18 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: python update_problem_id.py <new_problem_id> [description]")
         print("Example: python update_problem_id.py 25058 'New problem statement'")
+        print("Example: python update_problem_id.py 25057,25058,25063")
         sys.exit(1)
     
     new_id = sys.argv[1]
     description = sys.argv[2] if len(sys.argv) > 2 else None
     
-    # Validate the ID (should be numeric)
-    if not new_id.isdigit():
-        print(f"❌ Error: Problem ID should be numeric, got: {new_id}")
-        sys.exit(1)
+    # Validate the IDs (should be numeric)
+    new_id = ','.join(part.strip() for part in new_id.split(',') if part.strip())
+    for part in new_id.split(','):
+        if not part.isdigit():
+            print(f"❌ Error: Problem ID should be numeric, got: {part}")
+            sys.exit(1)
     
     success = update_problem_id(new_id, description)
     sys.exit(0 if success else 1)
@@ -19,7 +19,10 @@ def view_config():
             problem_config = json.load(f)
         
         print(f"📋 Problem Statement Configuration:")
-        print(f"   ID: {problem_config.get('problem_statement_id', 'Not set')}")
+        problem_ids = problem_config.get('problem_statement_id', 'Not set')
+        if isinstance(problem_ids, list):
+            problem_ids = ', '.join(problem_ids)
+        print(f"   ID: {problem_ids}")
         print(f"   Description: {problem_config.get('description', 'Not set')}")
         print(f"   Last Updated: {problem_config.get('last_updated', 'Unknown')}")
         if problem_config.get('notes'):
@@ -57,6 +60,8 @@ def view_config():
         
         print(f"📊 Current Monitor State:")
         print(f"   Last Count: {state.get('count', 'Unknown')}")
+        for problem_id, count in (state.get('counts') or {}).items():
+            print(f"     - {problem_id}: {count}")
         print(f"   Last Refresh: {state.get('last_refresh', 'Unknown')}")
         print(f"   Monitoring ID: {state.get('target_id', state.get('problem_id', 'Unknown'))}")
         
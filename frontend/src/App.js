@@ -13,9 +13,21 @@ function App() {
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState(null);
 
-  // Fetch data on component mount
+  // Fetch data on component mount, then follow pushed updates
   useEffect(() => {
     fetchData();
+    
+    // The server sends the current state on connect and again after every refresh;
+    // EventSource reconnects on its own and resumes from the last event ID
+    if (!window.EventSource) return undefined;
+    const source = new EventSource(`${API_URL}/api/stream`);
+    const handleState = (event) => {
+      setData(JSON.parse(event.data));
+      setLoading(false);
+    };
+    source.addEventListener('snapshot', handleState);
+    source.addEventListener('state', handleState);
+    return () => source.close();
   }, []);
 
   // Function to fetch data from API
@@ -38,12 +50,20 @@ function App() {
     try {
       setRefreshing(true);
       setError(null);
-      const response = await axios.post(`${API_URL}/api/refresh`);
+      // Refresh runs as a background job; poll it until the scrape finishes
+      let response = await axios.post(`${API_URL}/api/refresh`);
+      while (response.data.job && response.data.job.status === 'running') {
+        response = await axios.get(`${API_URL}/api/refresh/${response.data.job.id}?wait=20`);
+      }
       
       if (response.data.success) {
         setData(response.data.data);
       } else {
-        setError('Failed to refresh data. Please try again.');
+        // The last known counts come back even when the refresh could not run
+        if (response.data.data) {
+          setData(response.data.data);
+        }
+        setError(response.data.message || 'Failed to refresh data. Please try again.');
       }
     } catch (err) {
       console.error('Error refreshing data:', err);
@@ -103,11 +123,22 @@ function App() {
                     </p>
                   </div>
                   
+                  {data?.counts && Object.keys(data.counts).length > 1 && (
+                    <ul className="list-group mb-4">
+                      {Object.entries(data.counts).map(([problemId, count]) => (
+                        <li key={problemId} className="list-group-item d-flex justify-content-between">
+                          <span>{problemId}</span>
+                          <strong>{count !== null && count !== undefined ? count : 'N/A'}</strong>
+                        </li>
+                      ))}
+                    </ul>
+                  )}
+                  
                   <div className="mb-3">
                     <p className="mb-1"><strong>Problem ID:</strong> {data?.problem_id || 'N/A'}</p>
                     <p className="mb-1"><strong>Last Updated:</strong> {formatDate(data?.last_refresh)}</p>
                     <p className="mb-0 text-muted small">
-                      Auto-refreshes every hour
+                      Updates live; the server checks {data?.schedule ? `again at ${formatDate(data.schedule.next_run)}` : 'periodically'}
                       {data?.status === 'blocked' && ' (currently blocked)'}
                     </p>
                   </div>
@@ -130,7 +161,7 @@ function App() {
               </div>
             </Card.Body>
             <Card.Footer className="text-center text-muted">
-              <small>Data refreshes automatically every hour</small>
+              <small>Checks run more often while counts are changing</small>
             </Card.Footer>
           </Card>
         </Col>